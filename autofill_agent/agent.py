@@ -1,18 +1,86 @@
 import os
+import re
+import json
+import asyncio
+from concurrent.futures import Executor
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 
 # LangChain Imports
 from langchain_openai import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
+from langchain.schema import Document, HumanMessage, SystemMessage
 
 # Custom Modules
-from .load_and_process_pdf import load_and_split_pdf
+from .load_and_process_pdf import convert_pdf_to_markdown, iter_split_markdown, extract_user_facts
 from .retrieve_info_from_pdf import RAGManager
-from .analyze_web_form import analyze_form_structure
+from .analyze_web_form import analyze_form_structure, is_generic_label
+from .semantic_cache import SemanticCache
+from .form_plans import FormPlanCache
+from .http_clients import get_http_client, get_async_http_client
+from .profile_store import ProfileStore, profile_field_key
+from .lru import LRUDict
 
 load_dotenv()
 
+# Fields are answered in fused LLM calls of up to this many fields each
+FIELDS_PER_LLM_CALL = 25
+
+# Upper bound on concurrent LLM requests (keeps us under OpenAI QPM limits)
+MAX_CONCURRENT_LLM_REQUESTS = 25
+
+# Each retrieved chunk is trimmed to roughly this many characters before prompting
+CONTEXT_CHARS_PER_CHUNK = 300
+
+# Field types that never carry CV data
+SKIP_FIELD_TYPES = ['hidden', 'submit', 'button', 'image', 'reset']
+
+# Answers to these depend on the surrounding question, which the field itself does not carry
+UNCACHED_FIELD_TYPES = ['radio', 'checkbox']
+
+# Common application-form fields, answered once per CV at upload time: (label, type)
+PROFILE_FIELDS = [
+    ("First Name", "text"), ("Last Name", "text"), ("Full Name", "text"),
+    ("Email", "email"), ("Phone", "tel"),
+    ("Street Address", "text"), ("City", "text"), ("Postal Code", "text"), ("Country", "text"),
+    ("Nationality", "text"), ("Date of Birth", "text"),
+    ("LinkedIn", "url"), ("GitHub", "url"), ("Website", "url"),
+    ("Current Job Title", "text"), ("Current Company", "text"), ("Years of Experience", "text"),
+    ("Previous Job Title", "text"), ("Previous Company", "text"),
+    ("University", "text"), ("Degree", "text"), ("Field of Study", "text"),
+    ("Graduation Year", "text"), ("GPA", "text"),
+    ("Skills", "text"), ("Programming Languages", "text"), ("Languages", "text"),
+    ("Certifications", "text"), ("Summary", "text"),
+]
+
+# Static system prompt, always sent first and byte-identical across calls so that
+# OpenAI's automatic prompt-prefix caching can reuse it. Keep per-field details
+# in the user message only.
+SYSTEM_PROMPT = """You are a helpful assistant filling out a job application form based on a user's CV.
+You will be given information from the CV and a JSON list of form fields, each with an id, label, name, type and options.
+Your goal is to provide the exact value to fill into each field.
+
+- For text fields, return the text.
+- For radio/checkbox, return 'true' if it should be checked, 'false' otherwise.
+- For select/dropdown, return the EXACT option text from the provided list that matches the CV info.
+- If the information is not in the CV, return 'SKIP'.
+
+Respond with a JSON object of the form {"values": [{"id": <field id>, "value": "<value>"}, ...]} containing one entry per field.
+"""
+
+def _shrink(text: str, query_tokens: set, limit: int = CONTEXT_CHARS_PER_CHUNK) -> str:
+    """
+    Trims a CV chunk to `limit` characters, starting at the first sentence/line that
+    mentions any of the query tokens (or at the beginning if none does).
+    """
+    if len(text) <= limit:
+        return text
+    start = 0
+    for match in re.finditer(r"[^.!?\n]+[.!?]?", text):
+        if query_tokens & set(re.findall(r"\w+", match.group(0).lower())):
+            start = match.start()
+            break
+    return text[start:start + limit].strip()
+
 class AutofillAgent:
     def __init__(self):
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -23,33 +91,182 @@ class AutofillAgent:
         self.llm = ChatOpenAI(
             model="gpt-4o-mini",
             temperature=0,
-            api_key=self.openai_api_key
+            api_key=self.openai_api_key,
+            http_client=get_http_client(),
+            http_async_client=get_async_http_client(),
         )
         
         # 2. State & Resources
         self.rag_manager = RAGManager()
+        self.answer_cache = SemanticCache()
+        self.form_plans = FormPlanCache()
+        self.profiles = ProfileStore()
+        # user_id -> contact details regex-extracted from the CV (see extract_user_facts)
+        # (recently active users only; reloaded from the local store on demand)
+        self.user_facts: Dict[str, Dict[str, Any]] = LRUDict()
+        # user_id -> CV version the answer cache and facts above belong to
+        self._cv_versions: Dict[str, Optional[str]] = LRUDict()
+
+    async def process_pdf(self, pdf_path: str, user_id: str, executor: Optional[Executor] = None):
+        """
+        Standard PDF loading (Non-Agentic setup step).
 
-    def process_pdf(self, pdf_path: str, user_id: str):
-        """Standard PDF loading (Non-Agentic setup step)."""
+        Args:
+            pdf_path: Path of the CV PDF.
+            user_id: Owner of the CV.
+            executor: Runs the CPU-bound Docling conversion (a process pool in the server);
+                the default thread pool is used if omitted. Embedding and indexing stay in
+                this process so the in-memory stores and caches see the new CV.
+        """
         print(f"Processing PDF for user {user_id}")
-        chunks = load_and_split_pdf(pdf_path)
-        self.rag_manager.initialize_vector_store(chunks, user_id=user_id, force_recreate=False)
+        if not os.path.exists(pdf_path):
+            raise FileNotFoundError(f"PDF file not found at: {pdf_path}")
+        # Docling conversion blocks for seconds; keep the event loop free meanwhile
+        loop = asyncio.get_running_loop()
+        markdown_text = await loop.run_in_executor(executor, convert_pdf_to_markdown, pdf_path)
+        # Chunks stream into the embedding batches as they are split
+        chunks = iter_split_markdown(markdown_text, source=pdf_path)
+        facts = extract_user_facts(markdown_text)
+        await self.rag_manager.initialize_vector_store(chunks, user_id=user_id, facts=facts)
+        self.user_facts[user_id] = facts
+        # The CV changed, so previously generated answers may be stale
+        self.answer_cache.invalidate(user_id)
+        self._cv_versions[user_id] = self.rag_manager.cv_version(user_id)
+        await self.profiles.invalidate(user_id)
+        await self.extract_profile_fields(user_id)
+
+    async def extract_profile_fields(self, user_id: str):
+        """
+        Answers the common PROFILE_FIELDS from the user's CV ahead of any form.
+
+        The answers are written to the user's profile only (exact field-key matches skip
+        all retrieval at fill time). They are not seeded into the semantic answer cache:
+        these prompts carry no form-specific name or options, so paraphrase matching
+        against them would hand generic answers to unrelated fields.
+        """
+        if self.profiles.client is None:
+            # Without Redis there is nowhere to keep the answers; skip the LLM calls
+            return
+        fields = [
+            {'label': label, 'name': profile_field_key({'label': label, 'type': f_type}), 'type': f_type, 'options': []}
+            for label, f_type in PROFILE_FIELDS
+        ]
+        facts = self.user_facts.get(user_id, {})
+        values = [self._deterministic_value(field, facts) for field in fields]
+        pending = [i for i, value in enumerate(values) if value is None]
+        prompts = [self._query_prompt_for_field(fields[i]) for i in pending]
+
+        try:
+            context_batches = await self.rag_manager.query_vector_store_batch(prompts, user_id, k=3)
+            answers = await self._answer_fields([fields[i] for i in pending], context_batches)
+        except Exception as e:
+            # Profile extraction is an optimization only; forms still work without it
+            print(f"Could not extract profile fields for user {user_id}: {e}")
+            return
+        for i, answer in zip(pending, answers):
+            values[i] = answer
+
+        profile = {}
+        for field, value in zip(fields, values):
+            if value is not None and value != 'SKIP':
+                profile[field['name']] = value
+        await self.profiles.put_many(user_id, profile)
+        print(f"Extracted {len(profile)} of {len(fields)} profile fields for user {user_id}.")
 
     async def generate_form_actions(self, html_content: str, user_id: str) -> List[Dict]:
         """
         Analyzes HTML and returns a list of actions for the frontend to execute.
         This effectively replaces the "Autonomous Loop" with a single reasoning pass per page state.
         """
-        # 1. Analyze HTML
+        # 1. Analyze HTML (cached per page, shared by all users)
         print(f"Analyzing HTML for user {user_id}...")
-        fields = analyze_form_structure(html_content)
+        # SQLite reads/writes and HTML parsing block; keep them off the event loop
+        fields = await asyncio.to_thread(self.form_plans.get_fields, html_content)
+        if fields is None:
+            fields = await asyncio.to_thread(analyze_form_structure, html_content)
+            await asyncio.to_thread(self.form_plans.put_fields, html_content, fields)
         print(f"Found {len(fields)} fields.")
+        self._sync_cv_version(user_id)
         
+        values: List[str] = ['SKIP'] * len(fields)
+        facts = self.user_facts.get(user_id, {})
+        fillable = []
+        for i, field in enumerate(fields):
+            if field.get('type') in SKIP_FIELD_TYPES:
+                continue
+            # Unambiguous contact fields are answered straight from the CV facts
+            value = self._deterministic_value(field, facts)
+            if value is not None:
+                values[i] = value
+            else:
+                fillable.append(i)
+
+        # Fields answered for this user before (on any form) need no retrieval at all
+        profile_keys = {i: profile_field_key(fields[i]) for i in fillable}
+        known = [i for i in fillable if profile_keys[i]]
+        stored = await self.profiles.get_many(user_id, [profile_keys[i] for i in known])
+        for i, value in zip(known, stored):
+            if value is not None and self._is_valid_answer(fields[i], value):
+                values[i] = value
+                fillable.remove(i)
+        query_prompts = {i: self._query_prompt_for_field(fields[i]) for i in fillable}
+        cache_keys = {i: self._answer_key_for_field(fields[i]) for i in fillable}
+        cacheable = [i for i in fillable if cache_keys[i] is not None]
+
+        # 2. Embed all field prompts and cache keys in one request; answer repeated or
+        #    paraphrased fields from the cache
+        try:
+            vectors = await asyncio.to_thread(
+                self.rag_manager.embed_queries,
+                [query_prompts[i] for i in fillable] + [cache_keys[i] for i in cacheable],
+            )
+        except Exception as e:
+            # Without embeddings there is no cache lookup or retrieval, but the LLM can
+            # still answer (or SKIP) the fields, and resolved values are kept
+            print(f"Error embedding field prompts: {e}")
+            vectors = None
+        query_vectors = dict(zip(fillable, vectors)) if vectors is not None else {}
+        key_vectors = dict(zip(cacheable, vectors[len(fillable):])) if vectors is not None else {}
+
+        pending = []
+        for i in fillable:
+            cached = self.answer_cache.lookup(user_id, key_vectors[i]) if i in key_vectors else None
+            if cached is not None and self._is_valid_answer(fields[i], cached):
+                values[i] = cached
+            else:
+                pending.append(i)
+        print(f"Answered {len(fillable) - len(pending)} fields from cache.")
+
+        # 3. Query RAG for the remaining fields in one batched round-trip
+        if query_vectors:
+            context_batches = await self.rag_manager.query_vector_store_batch(
+                [query_prompts[i] for i in pending],
+                user_id,
+                k=3,
+                query_vectors=[query_vectors[i] for i in pending],
+            )
+        else:
+            context_batches = [[] for _ in pending]
+
+        # 4. Ask the LLM for those fields, many fields per call, calls running concurrently
+        answers = await self._answer_fields([fields[i] for i in pending], context_batches)
+        resolved = {}
+        for i, answer, context in zip(pending, answers, context_batches):
+            if answer is None:
+                # Unparseable LLM reply: leave the field empty, but don't remember that
+                continue
+            values[i] = answer
+            # Answers given without CV context (retrieval failed) are not cached either,
+            # so a transient failure doesn't stick until the next upload
+            if i in key_vectors and context:
+                self.answer_cache.add(user_id, cache_keys[i], key_vectors[i], answer)
+            if answer != 'SKIP' and profile_keys[i]:
+                resolved[profile_keys[i]] = answer
+        await self.profiles.put_many(user_id, resolved)
+
+        # 5. Map (field, value) pairs to actions, preserving form order
         actions = []
-        for field in fields:
-            # 2. Query RAG & LLM for each field
-            value = await self._get_value_for_field(field, user_id)
-            
+        for field, value in zip(fields, values):
             if value and value != 'SKIP':
                 # Map field type to action type
                 action_type = "fill"
@@ -71,52 +288,154 @@ class AutofillAgent:
         print(f"Generated {len(actions)} actions.")
         return actions
 
-    async def _get_value_for_field(self, field: Dict[str, Any], user_id: str) -> str:
+    def _sync_cv_version(self, user_id: str):
         """
-        Internal method to determine the value for a single field.
+        Drops the user's cached answers and reloads their CV facts if the CV was
+        re-indexed since (e.g. uploaded through another server process, or before a restart).
         """
+        version = self.rag_manager.cv_version(user_id)
+        changed = self._cv_versions.get(user_id) != version
+        if changed:
+            self.answer_cache.invalidate(user_id)
+            self._cv_versions[user_id] = version
+        # Facts may also have been evicted on their own
+        if changed or user_id not in self.user_facts:
+            self.user_facts[user_id] = self.rag_manager.cv_facts(user_id)
+
+    @staticmethod
+    def _query_prompt_for_field(field: Dict[str, Any]) -> str:
+        """Builds the RAG query used to look up a field's value in the CV."""
         label = field.get('label')
         name = field.get('name')
+        if field.get('type') in ['radio', 'checkbox']:
+            return f"Should I check the box for {label or name}?"
+        return f"What is the {label or name}?"
+
+    @staticmethod
+    def _answer_key_for_field(field: Dict[str, Any]) -> Optional[str]:
+        """
+        Text whose embedding keys the field in the semantic answer cache: label, name,
+        type and options, so same-labelled but different fields do not share answers.
+        None for fields whose answers must not be cached (radio/checkbox, generic labels).
+        """
+        if field.get('type') in UNCACHED_FIELD_TYPES or is_generic_label(field.get('label')):
+            return None
+        key = f"{field.get('label')} | name: {field.get('name') or ''} | type: {field.get('type')}"
+        if field.get('options'):
+            key += f" | options: {', '.join(field['options'])}"
+        return key
+
+    @staticmethod
+    def _deterministic_value(field: Dict[str, Any], facts: Dict[str, Any]) -> Optional[str]:
+        """Returns the value for email/tel/url fields from regex-extracted CV facts, if unambiguous."""
         f_type = field.get('type')
-        options = field.get('options', [])
+        if f_type in ('email', 'tel'):
+            return facts.get(f_type)
+        if f_type == 'url':
+            urls = facts.get('url', [])
+            hint = f"{field.get('label') or ''} {field.get('name') or ''}".lower()
+            for site in ('linkedin', 'github'):
+                if site in hint:
+                    return next((url for url in urls if site in url.lower()), None)
+            if len(urls) == 1:
+                return urls[0]
+        return None
 
-        if f_type in ['hidden', 'submit', 'button', 'image', 'reset']:
+    @staticmethod
+    def _is_valid_answer(field: Dict[str, Any], answer: str) -> bool:
+        """Checks that a cached answer still fits the field (dropdowns need an exact option)."""
+        options = field.get('options')
+        if options and answer != 'SKIP':
+            return answer in options
+        return True
+
+    @staticmethod
+    def _normalize_answer(value: Any) -> str:
+        """Converts a JSON value from the LLM into the string form actions use."""
+        if value is None:
             return 'SKIP'
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        return str(value).strip()
+
+    async def _answer_fields(self,
+                             fields: List[Dict[str, Any]],
+                             context_batches: List[List[Document]]) -> List[Optional[str]]:
+        """
+        Answers fields in fused LLM calls of FIELDS_PER_LLM_CALL fields each, with up to
+        MAX_CONCURRENT_LLM_REQUESTS calls in flight.
 
-        # 1. Query RAG
-        query_prompt = f"What is the {label or name}?"
-        if f_type == 'radio' or f_type == 'checkbox':
-             query_prompt = f"Should I check the box for {label or name}?"
+        Returns:
+            One answer per field, in the same order as `fields`; None for fields whose
+            LLM reply could not be parsed.
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM_REQUESTS)
 
-        context_docs = self.rag_manager.query_vector_store(query_prompt, user_id=user_id, k=3)
-        context_text = "\n".join([doc.page_content for doc in context_docs])
+        async def _bounded(start: int) -> List[Optional[str]]:
+            async with semaphore:
+                return await self._get_values_for_fields(
+                    fields[start:start + FIELDS_PER_LLM_CALL],
+                    context_batches[start:start + FIELDS_PER_LLM_CALL],
+                )
 
-        # 2. Ask LLM
-        system_prompt = """You are a helpful assistant filling out a job application form based on a user's CV.
-        You will be given information from the CV and details about a form field.
-        Your goal is to provide the exact value to fill into the field.
-        
-        - For text fields, return the text.
-        - For radio/checkbox, return 'true' if it should be checked, 'false' otherwise.
-        - For select/dropdown, return the EXACT option text from the provided list that matches the CV info.
-        - If the information is not in the CV, return 'SKIP'.
+        batch_answers = await asyncio.gather(*[
+            _bounded(start) for start in range(0, len(fields), FIELDS_PER_LLM_CALL)
+        ])
+        return [answer for answers in batch_answers for answer in answers]
+
+    async def _get_values_for_fields(self,
+                                     fields: List[Dict[str, Any]],
+                                     context_docs: List[List[Document]]) -> List[Optional[str]]:
         """
-        
+        Internal method to determine the values for several fields in one LLM call,
+        given the CV chunks already retrieved for each of them.
+        Returns None for every field if the reply cannot be parsed.
+        """
+        # 1. Build one shared RAG context: each field's chunks trimmed around its label,
+        #    then deduplicated across fields
+        unique_chunks = {}
+        for field, docs in zip(fields, context_docs):
+            query_tokens = {
+                token
+                for token in re.findall(r"\w+", f"{field.get('label') or ''} {field.get('name') or ''}".lower())
+                if len(token) > 2
+            }
+            for doc in docs:
+                unique_chunks.setdefault(_shrink(doc.page_content, query_tokens), None)
+        context_text = "\n".join(unique_chunks)
+
+        fields_json = json.dumps([
+            {
+                "id": idx,
+                "label": field.get('label'),
+                "name": field.get('name'),
+                "type": field.get('type'),
+                "options": field.get('options', []),
+            }
+            for idx, field in enumerate(fields)
+        ])
+
+        # 2. Ask LLM
         user_message = f"""
-        Field Label: {label}
-        Field Name: {name}
-        Field Type: {f_type}
-        Options (if dropdown): {options}
+        Form Fields:
+        {fields_json}
         
         CV Context:
         {context_text}
         
-        What value should I put in this field?
+        What value should I put in each field?
         """
 
         response = await self.llm.ainvoke([
-            SystemMessage(content=system_prompt),
+            SystemMessage(content=SYSTEM_PROMPT),
             HumanMessage(content=user_message)
-        ])
-        
-        return response.content.strip()
+        ], response_format={"type": "json_object"})
+
+        try:
+            entries = json.loads(response.content).get("values", [])
+            by_id = {int(entry["id"]): entry.get("value") for entry in entries}
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            print(f"Could not parse LLM response for {len(fields)} fields: {e}")
+            return [None] * len(fields)
+
+        return [self._normalize_answer(by_id.get(idx)) for idx in range(len(fields))]
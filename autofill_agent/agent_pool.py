@@ -0,0 +1,40 @@
+"""
+Per-user serialization of agent work.
+All per-user state of the agent (CV facts, vector stores, semantic caches, profiles) is
+partitioned by user_id, so requests of different users run fully concurrently. Requests
+of the same user (a CV upload racing a form fill, several tabs) take turns, so none of
+them sees a half-replaced CV or interleaves cache updates.
+"""
+
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+from .agent import AutofillAgent
+
+class AgentPool:
+    """Hands out the process-wide AutofillAgent under a per-user asyncio.Lock."""
+
+    def __init__(self, factory: Callable[[], AutofillAgent] = AutofillAgent):
+        """
+        Args:
+            factory: Builds the shared agent (LLM and RAG clients are created once).
+        """
+        self.agent = factory()
+        # user_id -> lock; entries disappear once no request holds or waits on them
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def _lock_for(self, user_id: str) -> asyncio.Lock:
+        lock = self._locks.get(user_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[user_id] = lock
+        return lock
+
+    @asynccontextmanager
+    async def session(self, user_id: str) -> AsyncIterator[AutofillAgent]:
+        """Yields the agent while holding `user_id`'s lock."""
+        lock = self._lock_for(user_id)
+        async with lock:
+            yield self.agent
@@ -2,12 +2,20 @@
 Tool for analyzing the current web page form structure.
 """
 
+import re
 from bs4 import BeautifulSoup
 import json # Or return Pydantic models for better structure
 
 # Potential form field types to identify
 INPUT_TYPES = ["text", "password", "email", "number", "tel", "url", "date", "search"]
 
+# Labels that say nothing about the question being asked (incl. the field_N fallback below)
+GENERIC_LABEL_PATTERN = re.compile(r"^(?:yes|no|true|false|ok|other|none|n/?a|field_\d+)?$", re.IGNORECASE)
+
+def is_generic_label(label) -> bool:
+    """Whether a field label is too generic to identify the field across forms."""
+    return GENERIC_LABEL_PATTERN.match((label or "").strip()) is not None
+
 def find_label_for_element(element, soup):
     """Tries to find the associated <label> for a form element."""
     # 1. Check for label wrapping the element
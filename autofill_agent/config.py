@@ -0,0 +1,15 @@
+"""
+Shared configuration defaults for the autofill agent.
+"""
+
+import os
+from pathlib import Path
+
+# Root directory for on-disk caches (Docling output, embeddings, ...)
+CACHE_DIR = Path(os.getenv("AUTOFILL_CACHE_DIR", "~/.cache/autofill_agent")).expanduser()
+
+# Worker processes available for CPU-bound PDF conversion in the server
+PDF_WORKERS = int(os.getenv("AUTOFILL_PDF_WORKERS", "4"))
+
+# Origins allowed to call the API (any Chrome extension by default; pin your extension ID in prod)
+ALLOWED_ORIGIN_REGEX = os.getenv("AUTOFILL_ALLOWED_ORIGIN_REGEX", r"chrome-extension://[a-p]{32}")
@@ -0,0 +1,84 @@
+"""
+Two-tier memoization of query embeddings (in-process LRU, then on disk).
+Field prompts ("What is the First name?") repeat across forms and sessions, so their
+embeddings are stored by content hash and only cache misses reach the embeddings API.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List
+import numpy as np
+import diskcache
+from langchain_core.embeddings import Embeddings
+
+from .config import CACHE_DIR
+
+EMBEDDING_CACHE_DIR = CACHE_DIR / "emb"
+
+# Entries kept in the in-process tier
+MEMORY_CACHE_SIZE = 4096
+
+class EmbeddingCache:
+    """Wraps an embeddings model with an LRU + persistent sha256(model, text) -> float32 vector cache."""
+
+    def __init__(self, embedding_model: Embeddings, directory=EMBEDDING_CACHE_DIR):
+        """
+        Args:
+            embedding_model: Model used to embed cache misses.
+            directory: Location of the diskcache database.
+        """
+        self.embedding_model = embedding_model
+        self.model_name = getattr(embedding_model, "model", type(embedding_model).__name__)
+        self.db = diskcache.Cache(str(directory))
+        # sha256 key -> vector, most recently used last
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        # Lookups run in worker threads (asyncio.to_thread), so guard the LRU
+        self._lock = threading.Lock()
+
+    def _recall(self, key: str):
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+            return vector
+
+    def _remember(self, key: str, vector: np.ndarray):
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            if len(self._memory) > MEMORY_CACHE_SIZE:
+                self._memory.popitem(last=False)
+
+    def _key(self, text: str) -> str:
+        # The model is part of the key so switching models never returns stale vectors
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode()).hexdigest()
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embeds a single text, reading from / writing to the cache."""
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: List[str]) -> List[np.ndarray]:
+        """Embeds several texts; all cache misses are sent in one embeddings request."""
+        keys = [self._key(text) for text in texts]
+        vectors = [None] * len(texts)
+        missing = []
+        for i, key in enumerate(keys):
+            vectors[i] = self._recall(key)
+            if vectors[i] is not None:
+                continue
+            cached = self.db.get(key)
+            if cached is None:
+                missing.append(i)
+            else:
+                vectors[i] = np.frombuffer(cached, dtype=np.float32)
+                self._remember(key, vectors[i])
+
+        if missing:
+            fresh = self.embedding_model.embed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, fresh):
+                vectors[i] = np.asarray(vector, dtype=np.float32)
+                self.db[keys[i]] = vectors[i].tobytes()
+                self._remember(keys[i], vectors[i])
+
+        return vectors
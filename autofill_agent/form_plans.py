@@ -0,0 +1,43 @@
+"""
+User-agnostic cache of form analysis results.
+A job form's structure is stable for days and identical for every applicant, so the
+parsed field list of a page is stored once and reused.
+"""
+
+import hashlib
+from typing import Any, Dict, List, Optional
+import diskcache
+
+from .config import CACHE_DIR
+
+FORM_PLAN_CACHE_DIR = CACHE_DIR / "form_plans"
+
+# Cached entries expire so that changed forms are eventually re-analyzed
+FORM_PLAN_TTL_SECONDS = 24 * 60 * 60
+
+# Bump whenever analyze_form_structure changes what it extracts, so entries written by
+# older code are not served
+FORM_ANALYSIS_VERSION = 1
+
+class FormPlanCache:
+    """Persistent cache of parsed fields, keyed by page HTML."""
+
+    def __init__(self, directory=FORM_PLAN_CACHE_DIR, ttl: int = FORM_PLAN_TTL_SECONDS):
+        """
+        Args:
+            directory: Location of the diskcache database.
+            ttl: Seconds before a cached entry expires.
+        """
+        self.db = diskcache.Cache(str(directory))
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(html_content: str) -> str:
+        return f"html:v{FORM_ANALYSIS_VERSION}:{hashlib.sha256(html_content.encode()).hexdigest()}"
+
+    def get_fields(self, html_content: str) -> Optional[List[Dict[str, Any]]]:
+        """Returns the analyzed fields of an identical page seen before, if any."""
+        return self.db.get(self._key(html_content))
+
+    def put_fields(self, html_content: str, fields: List[Dict[str, Any]]):
+        self.db.set(self._key(html_content), fields, expire=self.ttl)
@@ -0,0 +1,28 @@
+"""
+Process-wide HTTP clients for OpenAI traffic.
+Sharing one keep-alive HTTP/2 pool between the LLM and the embeddings model avoids a
+TCP/TLS handshake per request and lets concurrent requests multiplex on few sockets.
+"""
+
+import functools
+import httpx
+
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+@functools.lru_cache(maxsize=1)
+def get_http_client() -> httpx.Client:
+    """Shared synchronous client (embed_query / embed_documents / invoke)."""
+    return httpx.Client(http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+
+@functools.lru_cache(maxsize=1)
+def get_async_http_client() -> httpx.AsyncClient:
+    """Shared asynchronous client (aembed_documents / ainvoke). Bound to the server's event loop."""
+    return httpx.AsyncClient(http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+
+async def close_http_clients():
+    """Closes the shared clients that were created (called on server shutdown)."""
+    if get_async_http_client.cache_info().currsize:
+        await get_async_http_client().aclose()
+    if get_http_client.cache_info().currsize:
+        get_http_client().close()
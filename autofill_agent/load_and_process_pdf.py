@@ -1,7 +1,9 @@
 import os
-from typing import List
+import re
+import hashlib
+from typing import Any, Dict, Iterator, List, Optional
 from langchain.schema import Document
-from langchain.text_splitter import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter
+from langchain.text_splitter import MarkdownHeaderTextSplitter
 
 # Import Docling
 try:
@@ -10,6 +12,210 @@ except ImportError:
     print("Warning: Docling not installed. Install it via 'pip install docling'")
     DocumentConverter = None
 
+# Import google-re2 (optional: linear-time DFA matching, falls back to the stdlib engine)
+try:
+    import re2 as header_re
+except ImportError:
+    header_re = re
+
+from .config import CACHE_DIR
+
+# Docling output is cached by PDF content hash, so re-uploading the same CV skips conversion
+DOCLING_CACHE_DIR = CACHE_DIR / "docling"
+
+# Patterns for contact details that can be filled without asking the LLM
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_PATTERN = re.compile(r"(?:\(?\+|\()?\d[\d\s()./-]{7,}\d")
+# A number only counts as a phone number if it is international or labelled as one
+PHONE_LABEL_PATTERN = re.compile(r"(?:phone|tel|mobile|cell|handy)[\w.]*\s*[:|-]?\s*$", re.IGNORECASE)
+# Date ranges ("10.2019 - 03.2021", "2019 - 2021") look like phone numbers to PHONE_PATTERN
+DATE_LIKE_PATTERN = re.compile(r"\b\d{1,2}[./]\d{4}\b|\b(?:19|20)\d{2}\s*[-\u2013]\s*(?:19|20)\d{2}\b")
+URL_PATTERN = re.compile(r"https?://[^\s<>\[\]()|]+|(?:www\.)?(?:linkedin|github)\.com/[^\s<>\[\]()|]+")
+
+def convert_pdf_to_markdown(pdf_file_path: str) -> str:
+    """Converts a PDF to Markdown with Docling, reusing a cached result for identical files."""
+    with open(pdf_file_path, "rb") as f:
+        pdf_hash = hashlib.sha256(f.read()).hexdigest()
+    cache_path = DOCLING_CACHE_DIR / f"{pdf_hash}.md"
+
+    if cache_path.exists():
+        print(f"Using cached Docling conversion for: {pdf_file_path}")
+        return cache_path.read_text(encoding="utf-8")
+
+    if DocumentConverter is None:
+        raise ImportError("Docling is required for this function. Please install it.")
+
+    print(f"Converting PDF to Markdown using Docling: {pdf_file_path}")
+    converter = DocumentConverter()
+    result = converter.convert(pdf_file_path)
+    markdown_text = result.document.export_to_markdown()
+
+    try:
+        DOCLING_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(markdown_text, encoding="utf-8")
+    except OSError as e:
+        # Caching is an optimization only
+        print(f"Could not write Docling cache: {e}")
+
+    return markdown_text
+
+# Chunk size bounds for the final split
+CHUNK_SIZE = 800
+CHUNK_OVERLAP = 100
+
+# Markdown ATX headers (groups 1-2) and code fence lines (groups 3-4), matched in one pass;
+# inline (?m) so the same pattern compiles under re and re2
+HEADER_PATTERN = header_re.compile(r"(?m)^(?:(#{1,6})[ \t]+(.*?)[ \t]*|[ \t]*(```|~~~)(.*))$")
+
+class Re2HeaderSplitter(MarkdownHeaderTextSplitter):
+    """
+    MarkdownHeaderTextSplitter that finds headers with one precompiled regex pass
+    (google-re2 when available) instead of a per-line Python scan.
+
+    Sections are emitted per header, with stripped headers, matching the parent's
+    default aggregated output. Like the parent, `#` lines inside ``` / ~~~ code fences
+    are treated as content, not headers.
+    """
+
+    def split_text(self, text: str) -> List[Document]:
+        return list(self.iter_split_text(text))
+
+    def iter_split_text(self, text: str) -> Iterator[Document]:
+        """Yields each header section as soon as the next header closes it."""
+        header_names = dict(self.headers_to_split_on)
+        active: Dict[int, str] = {} # header level -> header text
+
+        def _section(content: str) -> Optional[Document]:
+            content = content.strip()
+            if not content:
+                return None
+            metadata = {header_names["#" * level]: active[level] for level in sorted(active)}
+            return Document(page_content=content, metadata=metadata)
+
+        position = 0
+        open_fence = "" # fence that opened the current code block, if any
+        for match in HEADER_PATTERN.finditer(text):
+            fence = match.group(3)
+            if fence is not None:
+                if not open_fence:
+                    # A line holding a whole ```inline span``` does not open a block
+                    if fence == "~~~" or "```" not in match.group(4):
+                        open_fence = fence
+                elif fence == open_fence:
+                    open_fence = ""
+                continue
+            marker, title = match.group(1), match.group(2)
+            if open_fence or marker not in header_names:
+                continue
+            section = _section(text[position:match.start()])
+            if section is not None:
+                yield section
+            level = len(marker)
+            active = {lvl: value for lvl, value in active.items() if lvl < level}
+            active[level] = title
+            position = match.end()
+        section = _section(text[position:])
+        if section is not None:
+            yield section
+
+def _split_pieces(text: str, chunk_size: int) -> List[str]:
+    """Splits text into lines (keeping newlines), breaking over-long lines into words."""
+    pieces = []
+    for line in text.splitlines(keepends=True):
+        if len(line) <= chunk_size:
+            pieces.append(line)
+            continue
+        for word in re.findall(r"\S+\s*", line):
+            pieces.extend(word[i:i + chunk_size] for i in range(0, len(word), chunk_size))
+    return pieces
+
+def greedy_split(text: str, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """
+    Packs lines (or words, for over-long lines) into chunks of at most `chunk_size`
+    characters in a single pass, carrying up to `chunk_overlap` trailing characters
+    over into the next chunk.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    length = 0
+    for piece in _split_pieces(text, chunk_size):
+        if current and length + len(piece) > chunk_size:
+            chunks.append("".join(current).strip())
+            # Carry trailing pieces over as overlap
+            overlap: List[str] = []
+            overlap_length = 0
+            for prev in reversed(current):
+                if overlap_length + len(prev) > chunk_overlap or overlap_length + len(prev) + len(piece) > chunk_size:
+                    break
+                overlap.insert(0, prev)
+                overlap_length += len(prev)
+            current, length = overlap, overlap_length
+        current.append(piece)
+        length += len(piece)
+    if current:
+        chunks.append("".join(current).strip())
+    return [chunk for chunk in chunks if chunk]
+
+def iter_split_markdown(markdown_text: str, source: str) -> Iterator[Document]:
+    """
+    Splits Docling Markdown by semantic headers (e.g., # Experience, # Education),
+    then greedily into chunks of at most CHUNK_SIZE characters.
+    Chunks are yielded section by section, so consumers (embedding) can start early.
+    """
+    # 1. Split by Headers (Semantic Chunking)
+    # CHANGED: Use underscores instead of spaces for metadata keys to match Qdrant schema
+    headers_to_split_on = [
+        ("#", "Header_1"),
+        ("##", "Header_2"),
+        ("###", "Header_3"),
+    ]
+    
+    markdown_splitter = Re2HeaderSplitter(headers_to_split_on=headers_to_split_on)
+
+    # 2. Size Split (Safety Net)
+    for split in markdown_splitter.iter_split_text(markdown_text):
+        for text in greedy_split(split.page_content):
+            # Add source metadata
+            yield Document(page_content=text, metadata={**split.metadata, "source": source})
+
+def split_markdown(markdown_text: str, source: str) -> List[Document]:
+    """List form of iter_split_markdown."""
+    return list(iter_split_markdown(markdown_text, source))
+
+def extract_user_facts(markdown_text: str) -> Dict[str, Any]:
+    """
+    Extracts unambiguous contact details from the CV text with regexes, so
+    email/tel/url fields can be filled without a RAG or LLM call.
+
+    Returns:
+        A dict with optional 'email' and 'tel' strings and a 'url' list.
+    """
+    facts: Dict[str, Any] = {}
+
+    email = EMAIL_PATTERN.search(markdown_text)
+    if email:
+        facts["email"] = email.group(0)
+
+    # Several distinct numbers (or none clearly marked) are left to RAG + LLM
+    phones = {}
+    for match in PHONE_PATTERN.finditer(markdown_text):
+        candidate = match.group(0).strip()
+        digits = "".join(ch for ch in candidate if ch.isdigit())
+        if not 9 <= len(digits) <= 15 or DATE_LIKE_PATTERN.search(candidate):
+            continue
+        line_start = markdown_text.rfind("\n", 0, match.start()) + 1
+        prefix = markdown_text[line_start:match.start()][-30:]
+        if candidate.lstrip("(").startswith("+") or PHONE_LABEL_PATTERN.search(prefix):
+            phones.setdefault(digits, candidate)
+    if len(phones) == 1:
+        facts["tel"] = next(iter(phones.values()))
+
+    urls = list(dict.fromkeys(url.rstrip(".,;)") for url in URL_PATTERN.findall(markdown_text)))
+    if urls:
+        facts["url"] = urls
+
+    return facts
+
 def load_and_split_pdf(pdf_file_path: str) -> List[Document]:
     """
     Loads a PDF using Docling (Vision/Layout aware) to convert it to Markdown,
@@ -18,41 +224,14 @@ def load_and_split_pdf(pdf_file_path: str) -> List[Document]:
     if not os.path.exists(pdf_file_path):
         raise FileNotFoundError(f"PDF file not found at: {pdf_file_path}")
 
-    if DocumentConverter is None:
-        raise ImportError("Docling is required for this function. Please install it.")
-
-    print(f"Converting PDF to Markdown using Docling: {pdf_file_path}")
-    
     try:
-        # 1. Convert PDF to Markdown using Docling
-        converter = DocumentConverter()
-        result = converter.convert(pdf_file_path)
-        markdown_text = result.document.export_to_markdown()
+        # 1. Convert PDF to Markdown using Docling (cached by content hash)
+        markdown_text = convert_pdf_to_markdown(pdf_file_path)
         
         print("PDF converted to Markdown. Splitting by headers...")
 
-        # 2. Split by Headers (Semantic Chunking)
-        # CHANGED: Use underscores instead of spaces for metadata keys to match Qdrant schema
-        headers_to_split_on = [
-            ("#", "Header_1"),
-            ("##", "Header_2"),
-            ("###", "Header_3"),
-        ]
-        
-        markdown_splitter = MarkdownHeaderTextSplitter(headers_to_split_on=headers_to_split_on)
-        header_splits = markdown_splitter.split_text(markdown_text)
-
-        # 3. Recursive Split (Safety Net)
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=800,
-            chunk_overlap=100
-        )
-        
-        final_chunks = text_splitter.split_documents(header_splits)
-        
-        # Add source metadata
-        for chunk in final_chunks:
-            chunk.metadata["source"] = pdf_file_path
+        # 2. Split into header-aware chunks
+        final_chunks = split_markdown(markdown_text, source=pdf_file_path)
             
         print(f"Successfully processed PDF into {len(final_chunks)} structured chunks.")
         return final_chunks
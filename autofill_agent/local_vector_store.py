@@ -0,0 +1,255 @@
+"""
+In-process vector store for CV-scale corpora.
+A single CV is a few dozen to a few hundred chunks, so a brute-force cosine search
+over a NumPy matrix is faster than any network round-trip to Qdrant.
+Embeddings are kept as int8 with a per-row scale, a quarter of the float32 size.
+Searches are two-stage: a BM25 lexical pre-filter picks candidates, which are then
+ranked by embedding similarity.
+"""
+
+import os
+import re
+import json
+import hashlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from langchain.schema import Document
+
+# Import rank_bm25 (optional: without it every chunk is an embedding candidate)
+try:
+    from rank_bm25 import BM25Okapi
+except ImportError:
+    print("Warning: rank_bm25 not installed. Install it via 'pip install rank_bm25'")
+    BM25Okapi = None
+
+from .config import CACHE_DIR
+from .lru import DEFAULT_MAX_USERS, LRUDict
+from .rag_kernels import topk_cosine_int8
+
+# Per-user embedding matrices are persisted here so they survive restarts
+VECTOR_CACHE_DIR = CACHE_DIR / "vectors"
+
+# Number of lexical candidates passed on to the embedding-similarity stage
+BM25_CANDIDATES = 50
+
+# Words of the field prompts ("What is the Phone?", "Should I check the box for ...?") and
+# other fillers; they occur in most chunks and would make every query a lexical match
+QUERY_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "box", "check", "do", "does", "for", "i", "in", "is", "my",
+    "of", "on", "or", "please", "should", "the", "to", "what", "which", "you", "your",
+})
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens used for BM25."""
+    return re.findall(r"\w+", text.lower())
+
+def query_terms(text: str) -> List[str]:
+    """BM25 query tokens of a field prompt, i.e. its label words without stopwords."""
+    return [token for token in tokenize(text) if token not in QUERY_STOPWORDS]
+
+def quantize_int8(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-row int8 quantization.
+
+    Returns:
+        (int8 matrix, float32 scale per row) such that matrix ~= quantized * scale.
+    """
+    scale = np.abs(matrix).max(axis=-1, keepdims=True) / 127.0
+    scale[scale == 0] = 1.0
+    quantized = np.round(matrix / scale).astype(np.int8)
+    return quantized, scale.astype(np.float32).reshape(matrix.shape[:-1])
+
+class LocalVectorStore:
+    """Per-user int8 embedding matrices with brute-force cosine search, persisted to .npz."""
+
+    def __init__(self, cache_dir=VECTOR_CACHE_DIR, max_users: int = DEFAULT_MAX_USERS):
+        """
+        Args:
+            cache_dir: Directory holding one .npz file per user.
+            max_users: Users kept in memory; others are reloaded from disk when queried.
+        """
+        self.cache_dir = cache_dir
+        # user_id -> (int8 unit-normalized matrix of shape (N, dim), float32 row scales (N,), documents);
+        # evicting a user drops the per-user entries below as well
+        self._stores: Dict[str, Tuple[np.ndarray, np.ndarray, List[Document]]] = LRUDict(
+            max_users, on_evict=lambda user_id, _: self._forget(user_id),
+        )
+        # user_id -> BM25 index over the same documents (rebuilt on load, never persisted)
+        self._bm25: Dict[str, "BM25Okapi"] = {}
+        # user_id -> (CV version, mtime_ns of the .npz it was loaded from / saved to).
+        # Another server process may re-index a user; a changed mtime triggers a reload.
+        self._versions: Dict[str, Tuple[str, Optional[int]]] = {}
+        # user_id -> facts extracted from the whole CV (see extract_user_facts), stored
+        # alongside the chunks so every process can use them
+        self._facts: Dict[str, Dict[str, Any]] = {}
+
+    def _forget(self, user_id: str):
+        self._bm25.pop(user_id, None)
+        self._versions.pop(user_id, None)
+        self._facts.pop(user_id, None)
+
+    def _path_for(self, user_id: str):
+        # user_id comes from the client, so never use it as a path component directly
+        return self.cache_dir / f"{hashlib.sha256(user_id.encode()).hexdigest()}.npz"
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    @staticmethod
+    def _mtime(path) -> Optional[int]:
+        try:
+            return path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def add(self,
+            user_id: str,
+            documents: List[Document],
+            vectors: Sequence[Sequence[float]],
+            facts: Optional[Dict[str, Any]] = None):
+        """Replaces the stored chunks (and CV facts) of a user and persists them to disk."""
+        matrix = self._normalize(np.asarray(vectors, dtype=np.float32))
+        matrix_q, scale = quantize_int8(matrix)
+        self._stores[user_id] = (matrix_q, scale, list(documents))
+        self._facts[user_id] = dict(facts or {})
+        self._build_bm25(user_id, documents)
+        serialized = json.dumps([
+            {"page_content": doc.page_content, "metadata": doc.metadata} for doc in documents
+        ])
+        serialized_facts = json.dumps(self._facts[user_id], sort_keys=True)
+        version = hashlib.sha256(f"{serialized}\0{serialized_facts}".encode()).hexdigest()
+        self._versions[user_id] = (version, None)
+
+        path = self._path_for(user_id)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename, so other processes never read a partial file
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.savez(f, vectors_q=matrix_q, scale=scale, documents=np.array(serialized),
+                         facts=np.array(serialized_facts), version=np.array(version))
+            os.replace(tmp_path, path)
+            self._versions[user_id] = (version, self._mtime(path))
+        except (OSError, TypeError) as e:
+            # Persistence is an optimization only; the in-memory copy is still valid
+            print(f"Could not persist local vector store for user {user_id}: {e}")
+
+    def _load(self, user_id: str) -> Optional[Tuple[np.ndarray, np.ndarray, List[Document]]]:
+        """
+        Returns the user's store, loading it from disk on first access and reloading it
+        when the file was rewritten (by another process) since.
+        """
+        store = self._stores.get(user_id)
+        path = self._path_for(user_id)
+        mtime = self._mtime(path)
+        if store is not None and (mtime is None or mtime == self._versions[user_id][1]):
+            return store
+        if mtime is None:
+            return None
+
+        try:
+            with np.load(path) as data:
+                if "vectors_q" in data:
+                    matrix_q, scale = data["vectors_q"], data["scale"]
+                else:
+                    # Stores written before quantization hold the float32 matrix
+                    matrix_q, scale = quantize_int8(data["vectors"])
+                serialized = str(data["documents"])
+                documents = [Document(**doc) for doc in json.loads(serialized)]
+                facts = json.loads(str(data["facts"])) if "facts" in data else {}
+                if "version" in data:
+                    version = str(data["version"])
+                else:
+                    version = hashlib.sha256(serialized.encode()).hexdigest()
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not load local vector store for user {user_id}: {e}")
+            return store
+
+        self._stores[user_id] = (matrix_q, scale, documents)
+        self._facts[user_id] = facts
+        self._versions[user_id] = (version, mtime)
+        self._build_bm25(user_id, documents)
+        return self._stores[user_id]
+
+    def version(self, user_id: str) -> Optional[str]:
+        """
+        Content hash of the user's current CV chunks (None if there are none).
+        Changes whenever the user's CV is re-indexed, by this or another process.
+        """
+        if self._load(user_id) is None:
+            return None
+        return self._versions[user_id][0]
+
+    def facts(self, user_id: str) -> Dict[str, Any]:
+        """CV facts stored with the user's chunks (empty if there are none)."""
+        if self._load(user_id) is None:
+            return {}
+        return self._facts.get(user_id, {})
+
+    def _build_bm25(self, user_id: str, documents: List[Document]):
+        if BM25Okapi is None or not documents:
+            return
+        self._bm25[user_id] = BM25Okapi([tokenize(doc.page_content) for doc in documents])
+
+    def _lexical_scores(self, user_id: str, terms: Sequence[str]) -> Optional[np.ndarray]:
+        """BM25 scores of every chunk of a user, or None if no lexical index/overlap."""
+        bm25 = self._bm25.get(user_id)
+        if bm25 is None or not terms:
+            return None
+        scores = bm25.get_scores(list(terms))
+        return scores if scores.max() > 0 else None
+
+    def lexical_search(self,
+                       user_id: str,
+                       query_text: str,
+                       k: int = 3,
+                       required_terms: Sequence[str] = ()) -> Optional[List[Document]]:
+        """
+        Returns the `k` best BM25 matches for the query's label words without any
+        embedding work, or None when lexical search cannot answer (no index, no term
+        overlap, or none of `required_terms` occurs in the CV).
+        """
+        store = self._load(user_id)
+        if store is None:
+            return None
+        if required_terms and self._lexical_scores(user_id, required_terms) is None:
+            return None
+        scores = self._lexical_scores(user_id, query_terms(query_text))
+        if scores is None:
+            return None
+        documents = store[2]
+        top_k = np.argsort(-scores)[:k]
+        return [documents[i] for i in top_k if scores[i] > 0]
+
+    def has(self, user_id: str) -> bool:
+        """Whether chunks for this user are available locally."""
+        return self._load(user_id) is not None
+
+    def search(self,
+               user_id: str,
+               query_vector: Sequence[float],
+               k: int = 3,
+               query_text: Optional[str] = None) -> List[Document]:
+        """
+        Returns the `k` chunks of a user most similar to `query_vector`.
+
+        If `query_text` is given, only the top BM25 candidates for it are scored by
+        embedding similarity (all chunks if it shares no terms with the CV).
+        """
+        store = self._load(user_id)
+        if store is None:
+            return []
+        matrix_q, scale, documents = store
+
+        candidates = np.arange(len(documents))
+        scores = self._lexical_scores(user_id, query_terms(query_text or ""))
+        if scores is not None and len(documents) > BM25_CANDIDATES:
+            candidates = np.argpartition(-scores, BM25_CANDIDATES - 1)[:BM25_CANDIDATES]
+
+        query = self._normalize(np.asarray(query_vector, dtype=np.float32))
+        query_q, query_scale = quantize_int8(query)
+        top_k, _ = topk_cosine_int8(matrix_q[candidates], scale[candidates], query_q, query_scale, k)
+        return [documents[candidates[i]] for i in top_k]
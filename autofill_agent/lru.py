@@ -0,0 +1,42 @@
+"""
+Size-bounded dict for per-user in-process state.
+The server is long-lived and sees an open-ended set of users; per-user caches keep only
+the most recently used users and rebuild (or reload from disk) everything else on demand.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Optional
+
+# Users whose in-process state is kept by default
+DEFAULT_MAX_USERS = 256
+
+class LRUDict(OrderedDict):
+    """OrderedDict that evicts the least recently read or written key beyond `max_size`."""
+
+    def __init__(self,
+                 max_size: int = DEFAULT_MAX_USERS,
+                 on_evict: Optional[Callable[[object, object], None]] = None):
+        """
+        Args:
+            max_size: Number of keys kept.
+            on_evict: Called with (key, value) for every evicted entry.
+        """
+        super().__init__()
+        self.max_size = max_size
+        self.on_evict = on_evict
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_size:
+            evicted_key, evicted_value = self.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(evicted_key, evicted_value)
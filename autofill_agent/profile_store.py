@@ -0,0 +1,83 @@
+"""
+Per-user profile of resolved form answers, shared across server processes via Redis.
+Most forms ask the same few fields (first name, email, city, ...); once answered for a
+user they are served from the `user_profile:{user_id}` hash without embeddings, vector
+search or LLM calls. Disabled when REDIS_URL is unset or redis is not installed.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from .analyze_web_form import is_generic_label
+from .redis_client import get_redis_client
+
+# Profiles expire after a week; a new CV upload clears them immediately
+PROFILE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Only free-text and dropdown answers are profile facts; a radio/checkbox answer
+# depends on a question the field itself does not carry. "input" is how
+# analyze_form_structure reports an <input> without a type attribute (a text box)
+PROFILE_FIELD_TYPES = [
+    "input", "text", "email", "tel", "url", "number", "date", "search", "textarea", "select", "select-one",
+]
+
+def profile_field_key(field: Dict[str, Any]) -> Optional[str]:
+    """
+    Normalized key of a form field ("First Name" / "first-name" -> "first_name"), or
+    None if the field must not be stored in or answered from the profile (wrong type,
+    or a generic/fallback label such as "Yes" or "field_3").
+    """
+    label = field.get('label')
+    if field.get('type') not in PROFILE_FIELD_TYPES or is_generic_label(label):
+        return None
+    key = re.sub(r"\W+", "_", label.lower()).strip("_")
+    return key or None
+
+class ProfileStore:
+    """Redis hash of field key -> answer per user."""
+
+    def __init__(self, client=None, ttl: int = PROFILE_TTL_SECONDS):
+        """
+        Args:
+            client: Async Redis client with decoded responses (defaults to the shared
+                client from get_redis_client; None there disables the profile).
+            ttl: Seconds before an unused profile expires.
+        """
+        self.client = client if client is not None else get_redis_client()
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"user_profile:{user_id}"
+
+    async def get_many(self, user_id: str, field_keys: List[str]) -> List[Optional[str]]:
+        """Returns the stored answer for each key (None where unknown) in one HMGET."""
+        if self.client is None or not field_keys:
+            return [None] * len(field_keys)
+        try:
+            return await self.client.hmget(self._key(user_id), field_keys)
+        except Exception as e:
+            # The profile is an optimization only; fall back to RAG
+            print(f"Could not read profile for user {user_id}: {e}")
+            return [None] * len(field_keys)
+
+    async def put_many(self, user_id: str, answers: Dict[str, str]):
+        """Stores answers and refreshes the profile's TTL."""
+        if self.client is None or not answers:
+            return
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.hset(self._key(user_id), mapping=answers)
+                pipe.expire(self._key(user_id), self.ttl)
+                await pipe.execute()
+        except Exception as e:
+            print(f"Could not update profile for user {user_id}: {e}")
+
+    async def invalidate(self, user_id: str):
+        """Drops a user's profile (e.g. after a new CV upload)."""
+        if self.client is None:
+            return
+        try:
+            await self.client.delete(self._key(user_id))
+        except Exception as e:
+            print(f"Could not clear profile for user {user_id}: {e}")
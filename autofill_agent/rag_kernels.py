@@ -0,0 +1,54 @@
+"""
+Numeric kernels for the in-process vector store.
+The int8 similarity loop is JIT-compiled with Numba when it is installed, fusing the
+dot product with the rescaling; otherwise an equivalent NumPy implementation is used.
+"""
+
+from typing import Tuple
+import numpy as np
+
+# Import Numba (optional: falls back to NumPy)
+try:
+    from numba import njit, prange
+except ImportError:
+    print("Warning: numba not installed. Install it via 'pip install numba'")
+    njit = None
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, nogil=True, cache=True)
+    def cosine_int8(matrix_q, scale, query_q, query_scale):
+        """Rescaled int8 dot products of every row of `matrix_q` with `query_q`."""
+        n, dim = matrix_q.shape
+        sims = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            acc = 0
+            for d in range(dim):
+                acc += np.int32(matrix_q[i, d]) * np.int32(query_q[d])
+            sims[i] = acc * scale[i] * query_scale
+        return sims
+
+    # Warm start: compile (or load from the on-disk cache) at import, not on the first query
+    cosine_int8(np.zeros((1, 1), dtype=np.int8), np.ones(1, dtype=np.float32),
+                np.zeros(1, dtype=np.int8), np.float32(1.0))
+else:
+    def cosine_int8(matrix_q, scale, query_q, query_scale):
+        """Rescaled int8 dot products of every row of `matrix_q` with `query_q`."""
+        # Accumulate in int32: 1536 products of up to 127*127 overflow int16
+        return (matrix_q.astype(np.int32) @ query_q.astype(np.int32)) * scale * query_scale
+
+def topk_cosine_int8(matrix_q: np.ndarray,
+                     scale: np.ndarray,
+                     query_q: np.ndarray,
+                     query_scale: float,
+                     k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the indices and similarities of the `k` rows most similar to the query,
+    best first.
+    """
+    sims = cosine_int8(matrix_q, scale, query_q, np.float32(query_scale))
+    k = min(k, len(sims))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    top_k = np.argpartition(-sims, k - 1)[:k]
+    top_k = top_k[np.argsort(-sims[top_k])]
+    return top_k, sims[top_k]
@@ -0,0 +1,31 @@
+"""
+Process-wide Redis client shared by the profile store and the chunk text store.
+Both use one connection pool; Redis features are disabled when REDIS_URL is unset or
+redis is not installed.
+"""
+
+import os
+import functools
+
+# Import redis (optional: without it profiles are not cached and chunk text stays in Qdrant)
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    print("Warning: redis not installed. Install it via 'pip install redis'")
+    aioredis = None
+
+@functools.lru_cache(maxsize=1)
+def get_redis_client():
+    """
+    Shared asyncio Redis client returning str values, or None when Redis is not
+    configured. Bound to the server's event loop once used.
+    """
+    redis_url = os.getenv("REDIS_URL")
+    if not redis_url or aioredis is None:
+        return None
+    return aioredis.from_url(redis_url, decode_responses=True)
+
+async def close_redis_client():
+    """Closes the shared client if it was created (called on server shutdown)."""
+    if get_redis_client.cache_info().currsize and get_redis_client() is not None:
+        await get_redis_client().aclose()
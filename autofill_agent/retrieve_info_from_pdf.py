@@ -1,17 +1,115 @@
 """
 Tool for managing the RAG pipeline: embedding chunks and retrieving information.
-Uses OpenAI Embeddings and Qdrant Vector Database.
+Uses OpenAI Embeddings and Qdrant Vector Database, with an in-process copy of
+each user's chunks for fast local search.
 """
 
 import os
-from typing import List, Optional
-from langchain_community.vectorstores import Qdrant
+import uuid
+import hashlib
+import asyncio
+import functools
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import xxhash
 from langchain_openai import OpenAIEmbeddings
 from langchain.schema import Document
-from qdrant_client import QdrantClient, models
+from qdrant_client import AsyncQdrantClient, models
+
+from .http_clients import get_http_client, get_async_http_client
+from .local_vector_store import LocalVectorStore, query_terms
+from .embedding_cache import EmbeddingCache
+from .semantic_cache import SemanticCache
+from .lru import LRUDict
+from .redis_client import get_redis_client
 
 # Configuration Defaults
 DEFAULT_COLLECTION_NAME = os.getenv("QDRANT_COLLECTION_NAME", "personal-collection")
+VECTOR_NAME = "user-information" # Named vector in the collection config
+
+# Chunks are embedded in batches of this size, up to EMBED_MAX_CONCURRENCY requests in flight
+EMBED_BATCH_SIZE = 32
+EMBED_MAX_CONCURRENCY = 8
+
+# Points are uploaded in batches of this size, by up to UPLOAD_PARALLEL worker processes
+UPLOAD_BATCH_SIZE = 256
+UPLOAD_PARALLEL = 4
+
+# Collection layout: full-precision vectors on disk, int8 copies in RAM for the graph search
+QUANTIZATION_CONFIG = models.ScalarQuantization(
+    scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+)
+# m=0 skips the global graph: searches are always filtered to one user, whose own
+# sub-graph (payload_m) is built from the tenant index on metadata.user_id
+# Filtered searches whose matching vectors fit in full_scan_threshold (KB, ~160 vectors of
+# 1536 dims) skip the graph and scan the user's points via the payload index: a typical
+# CV of a few dozen chunks never touches HNSW
+HNSW_CONFIG = models.HnswConfigDiff(m=0, ef_construct=200, payload_m=16, full_scan_threshold=1000)
+
+# Lower bound of the HNSW search beam; it grows with k (see search_params)
+MIN_HNSW_EF = 64
+
+def search_params(k: int, hnsw_ef: Optional[int] = None) -> models.SearchParams:
+    """
+    Qdrant search parameters for a top-`k` query.
+
+    The int8 vectors are searched and 2*k candidates rescored against the original
+    vectors. `hnsw_ef` defaults to max(MIN_HNSW_EF, 4*k).
+    """
+    return models.SearchParams(
+        hnsw_ef=hnsw_ef or max(MIN_HNSW_EF, 4 * k),
+        exact=False,
+        quantization=models.QuantizationSearchParams(ignore=False, rescore=True, oversampling=2.0),
+    )
+
+# Only these payload keys are read back into Documents; vectors are never returned
+PAYLOAD_SELECTOR = models.PayloadSelectorInclude(include=["page_content", "metadata"])
+
+# Markdown headers are indexed through short fixed-width hashes stored as "<key>_h"
+HASHED_HEADERS = ("Header_1", "Header_2")
+
+# Queries with these words are resolved by BM25 alone, provided the CV spells the word
+# out literally ("e-mail" tokenizes to "e", "mail")
+LEXICAL_ONLY_KEYWORDS = ("email", "mail", "phone", "mobile", "telephone")
+
+def header_hash(header: str) -> str:
+    """
+    16-hex-digit hash of a header, the keyword used in the Header_*_h payload indexes.
+    Always xxh64: every process writing to the shared collection must produce the same keys.
+    """
+    return xxhash.xxh64_hexdigest(header.encode())
+
+@functools.lru_cache(maxsize=1)
+def get_embedding_model() -> OpenAIEmbeddings:
+    """Returns the process-wide OpenAI embeddings client (created on first use)."""
+    print("Initializing OpenAI Embeddings...")
+    return OpenAIEmbeddings(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+    )
+
+@functools.lru_cache(maxsize=1)
+def get_qdrant_client() -> AsyncQdrantClient:
+    """
+    Returns the process-wide async Qdrant client (gRPC transport), so its channel is reused.
+    Bound to the server's event loop once used.
+    """
+    qdrant_url = os.getenv("QDRANT_URL")
+    print(f"Connecting to Qdrant at {qdrant_url}...")
+    return AsyncQdrantClient(
+        url=qdrant_url,
+        api_key=os.getenv("QDRANT_API_KEY"),
+        prefer_grpc=True,
+    )
+
+def chunk_text_key(user_id: str) -> str:
+    return f"chunks:{user_id}"
+
+async def close_clients():
+    """Closes the shared Qdrant client if it was created (called on server shutdown)."""
+    if get_qdrant_client.cache_info().currsize:
+        await get_qdrant_client().close()
 
 class RAGManager:
     """Manages PDF chunk embedding, storage, and retrieval using Qdrant and OpenAI embeddings."""
@@ -33,85 +131,235 @@ class RAGManager:
             print("Warning: Missing QDRANT_URL, QDRANT_API_KEY, or OPENAI_API_KEY in environment.")
 
         self.embedding_model = None
-        self.vector_store = None
+        self.embedding_cache = None
         self.client = None
+        self.text_store = None
+        # Local copy of each user's chunks; Qdrant stays the durable, shared store
+        self.local_store = LocalVectorStore()
+        # Per-user (query embedding -> (k, retrieved chunks)), reset when the CV changes
+        self.retrieval_cache = SemanticCache()
+        # user_id -> CV version the retrieval cache was filled from
+        self._cv_versions: Dict[str, Optional[str]] = LRUDict()
 
         self._initialize_resources()
 
     def _initialize_resources(self):
-        """Initializes the embedding model and Qdrant client."""
+        """Attaches the shared embedding model and Qdrant client."""
         try:
-            print("Initializing OpenAI Embeddings...")
-            self.embedding_model = OpenAIEmbeddings(api_key=self.openai_api_key)
-            
-            print(f"Connecting to Qdrant at {self.qdrant_url}...")
-            self.client = QdrantClient(
-                url=self.qdrant_url,
-                api_key=self.qdrant_api_key
-            )
+            self.embedding_model = get_embedding_model()
+            self.embedding_cache = EmbeddingCache(self.embedding_model)
+            self.client = get_qdrant_client()
+            # Chunk text lives in `chunks:{user_id}` hashes (point id -> page_content)
+            self.text_store = get_redis_client()
             print("RAG Resources initialized.")
         except Exception as e:
             print(f"Error initializing RAG resources: {e}")
             raise
 
-    def _create_payload_indexes(self):
-        """Creates indexes for faster filtering on metadata fields."""
-        try:
+    async def _create_payload_indexes(self):
+        """
+        Creates indexes for faster filtering on metadata fields.
+        Idempotent; called on every ingest so collections created elsewhere get them too.
+        """
+        indexes = [
             # existing user_id index
-            self.client.create_payload_index(
-                collection_name=self.collection_name,
-                field_name="user_id",
-                field_schema=models.PayloadSchemaType.KEYWORD,
-            )
-            self.client.create_payload_index(
-                collection_name=self.collection_name,
-                field_name="metadata.user_id", # LangChain often nests it
-                field_schema=models.PayloadSchemaType.KEYWORD,
-            )
-            # New indexes for structured search (Markdown Headers)
-            self.client.create_payload_index(
-                collection_name=self.collection_name,
-                field_name="metadata.Header_1", # Note: LangChain nests metadata
-                field_schema=models.PayloadSchemaType.KEYWORD,
-            )
-            self.client.create_payload_index(
+            ("user_id", models.PayloadSchemaType.KEYWORD),
+            # Tenant field: Qdrant co-locates and builds one HNSW sub-graph per user
+            ("metadata.user_id", # LangChain often nests it
+             models.KeywordIndexParams(type=models.KeywordIndexType.KEYWORD, is_tenant=True)),
+        ]
+        # Indexes for structured search (Markdown Headers), on fixed-width hashes
+        # rather than the free-form header text (see header_hash)
+        indexes += [(f"metadata.{header}_h", models.PayloadSchemaType.KEYWORD) for header in HASHED_HEADERS]
+        for field_name, field_schema in indexes:
+            try:
+                await self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field_name,
+                    field_schema=field_schema,
+                )
+            except Exception as e:
+                # One failing index must not keep the others from being created
+                print(f"Index creation note ({field_name}): {e}")
+        print("Payload indexes created/updated.")
+
+    async def _ensure_collection(self, vector_size: int):
+        """
+        Creates the collection (with the named vector config) if it does not exist yet,
+        otherwise brings its HNSW and quantization settings up to date. Payload indexes
+        are ensured either way, before any points are upserted or filtered on
+        (strict-mode collections reject filters on unindexed fields).
+        """
+        if not await self.client.collection_exists(self.collection_name):
+            print(f"Creating Qdrant collection '{self.collection_name}'...")
+            await self.client.create_collection(
                 collection_name=self.collection_name,
-                field_name="metadata.Header_2",
-                field_schema=models.PayloadSchemaType.KEYWORD,
+                vectors_config={
+                    VECTOR_NAME: models.VectorParams(size=vector_size, distance=models.Distance.COSINE, on_disk=True),
+                },
+                quantization_config=QUANTIZATION_CONFIG,
+                hnsw_config=HNSW_CONFIG,
             )
-            print("Payload indexes created/updated.")
-        except Exception as e:
-            # Indexes might already exist, or 400 if strictly valid format required
-            print(f"Index creation note: {e}")
+        else:
+            try:
+                # Per-vector settings override the collection's, so update both
+                await self.client.update_collection(
+                    collection_name=self.collection_name,
+                    vectors_config={
+                        VECTOR_NAME: models.VectorParamsDiff(
+                            hnsw_config=HNSW_CONFIG, quantization_config=QUANTIZATION_CONFIG,
+                        ),
+                    },
+                    hnsw_config=HNSW_CONFIG,
+                    quantization_config=QUANTIZATION_CONFIG,
+                )
+            except Exception as e:
+                print(f"Could not update collection config: {e}")
+        # Per-tenant graphs are only built for fields indexed before points arrive
+        await self._create_payload_indexes()
+
+    @staticmethod
+    def _point_id(user_id: str, chunk: Document) -> str:
+        """Content-addressed point ID: the same chunk of the same user always maps to it."""
+        digest = hashlib.sha256(f"{user_id}\0{chunk.page_content}".encode()).hexdigest()
+        return str(uuid.UUID(hex=digest[:32]))
 
-    def initialize_vector_store(self, chunks: List[Document], user_id: str, force_recreate: bool = False):
+    async def _existing_vectors(self, point_ids: List[str]) -> Dict[str, List[float]]:
+        """Returns {point_id: vector} for the IDs already stored in the collection."""
+        points = await self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=point_ids,
+            with_payload=False,
+            with_vectors=[VECTOR_NAME],
+        )
+        return {str(point.id): point.vector[VECTOR_NAME] for point in points}
+
+    async def _aembed_and_upsert(self,
+                                 chunks: Iterable[Document],
+                                 user_id: str) -> Tuple[List[Document], List[List[float]]]:
         """
-        Initializes the Qdrant vector store with user-specific chunks.
+        Embeds chunks in concurrent batches and uploads them into Qdrant.
+
+        `chunks` may be a lazy iterator (see iter_split_markdown): every
+        EMBED_BATCH_SIZE chunks are dispatched for embedding right away, with up to
+        EMBED_MAX_CONCURRENCY requests in flight, while the rest are still produced.
+
+        Point IDs are derived from the chunk content, so on a re-upload only new or
+        edited chunks are embedded and upserted; chunks no longer in the CV are deleted.
+
+        Returns:
+            The indexed chunks and their vectors, in the same order.
         """
-        if not chunks:
-            print("No chunks provided to initialize vector store.")
-            return
+        semaphore = asyncio.Semaphore(EMBED_MAX_CONCURRENCY)
+        # Chunks seen before can only exist if the collection does
+        check_existing = await self.client.collection_exists(self.collection_name)
+        new_ids = set()
+
+        async def _embed(batch: List[Document]) -> List[List[float]]:
+            async with semaphore:
+                ids = [self._point_id(user_id, c) for c in batch]
+                existing = {}
+                if check_existing:
+                    existing = await self._existing_vectors(ids)
+                missing = [i for i, point_id in enumerate(ids) if point_id not in existing]
+                fresh = []
+                if missing:
+                    fresh = await self.embedding_model.aembed_documents([batch[i].page_content for i in missing])
+                new_ids.update(ids[i] for i in missing)
+                vectors = [existing.get(point_id) for point_id in ids]
+                for i, vector in zip(missing, fresh):
+                    vectors[i] = vector
+                return vectors
 
-        # Add user_id to metadata for EVERY chunk
+        indexed: List[Document] = []
+        tasks = []
+        batch: List[Document] = []
         for chunk in chunks:
+            # Add user_id to metadata for EVERY chunk
             chunk.metadata["user_id"] = user_id
+            for header in HASHED_HEADERS:
+                if header in chunk.metadata:
+                    chunk.metadata[f"{header}_h"] = header_hash(chunk.metadata[header])
+            indexed.append(chunk)
+            batch.append(chunk)
+            if len(batch) == EMBED_BATCH_SIZE:
+                tasks.append(asyncio.create_task(_embed(batch)))
+                batch = []
+                await asyncio.sleep(0) # Let the request start while we keep splitting
+        if batch:
+            tasks.append(asyncio.create_task(_embed(batch)))
 
-        try:
-            print(f"Indexing {len(chunks)} chunks into Qdrant for user {user_id}...")
-            
-            # Use LangChain wrapper for convenience in ADDING documents (it handles embedding + upsert well)
-            self.vector_store = Qdrant.from_documents(
-                documents=chunks,
-                embedding=self.embedding_model,
-                url=self.qdrant_url,
-                api_key=self.qdrant_api_key,
+        if not indexed:
+            return [], []
+
+        # Embed once; the vectors feed both Qdrant and the local store
+        vectors = [vector for result in await asyncio.gather(*tasks) for vector in result]
+        point_ids = [self._point_id(user_id, chunk) for chunk in indexed]
+        print(f"Indexing {len(new_ids)} new of {len(indexed)} chunks into Qdrant for user {user_id}...")
+
+        await self._ensure_collection(vector_size=len(vectors[0]))
+        # Chunks of the previous CV that are gone from this one
+        await self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=models.FilterSelector(
+                filter=models.Filter(
+                    must=self._user_filter(user_id).must,
+                    must_not=[models.HasIdCondition(has_id=point_ids)],
+                )
+            ),
+            wait=False,
+        )
+        # With a text store, Qdrant payloads carry only the (filterable) metadata
+        text_in_payload = not await self._store_chunk_text(user_id, point_ids, indexed)
+        points = [
+            models.PointStruct(
+                id=point_id,
+                vector={VECTOR_NAME: vector},
+                payload=(
+                    {"page_content": chunk.page_content, "metadata": chunk.metadata}
+                    if text_in_payload else {"metadata": chunk.metadata}
+                ),
+            )
+            for point_id, chunk, vector in zip(point_ids, indexed, vectors)
+            if point_id in new_ids
+        ]
+        if points:
+            # Worker processes only pay off when there is more than one batch to send.
+            # upload_points is blocking even on the async client, so run it in a thread
+            parallel = min(UPLOAD_PARALLEL, -(-len(points) // UPLOAD_BATCH_SIZE))
+            await asyncio.to_thread(
+                self.client.upload_points,
                 collection_name=self.collection_name,
-                force_recreate=force_recreate,
-                vector_name="user-information" # Matches collection config
+                points=points,
+                batch_size=UPLOAD_BATCH_SIZE,
+                parallel=parallel,
+                wait=False,
             )
-            
-            # Ensure indexes are set up after collection creation
-            self._create_payload_indexes()
+        return indexed, vectors
+
+    async def initialize_vector_store(self,
+                                      chunks: Iterable[Document],
+                                      user_id: str,
+                                      facts: Optional[Dict[str, Any]] = None):
+        """
+        Initializes the Qdrant vector store with user-specific chunks.
+
+        Args:
+            chunks: The CV chunks (may be a lazy iterator).
+            user_id: Owner of the CV.
+            facts: Facts extracted from the whole CV, persisted with the local copy so
+                other server processes can read them back (see cv_facts).
+        """
+        try:
+            indexed, vectors = await self._aembed_and_upsert(chunks, user_id)
+            if not indexed:
+                print("No chunks provided to initialize vector store.")
+                return
+
+            self.local_store.add(user_id, indexed, vectors, facts=facts)
+            # Earlier retrievals point at the old CV
+            self.retrieval_cache.invalidate(user_id)
+            self._cv_versions[user_id] = self.local_store.version(user_id)
             
             print("Vector store successfully initialized and populated.")
             
@@ -119,19 +367,39 @@ class RAGManager:
             print(f"Error initializing vector store: {e}")
             raise
 
-    def query_vector_store(self, query: str, user_id: str, k: int = 3) -> List[Document]:
+    def cv_version(self, user_id: str) -> Optional[str]:
         """
-        Queries the vector store using raw Qdrant Client to avoid LangChain wrapper issues.
+        Returns the version of the user's indexed CV, reloading the local store if another
+        server process re-indexed it. The retrieval cache is cleared when the version changed.
         """
-        # 1. Embed query
-        try:
-            query_vector = self.embedding_model.embed_query(query)
-        except Exception as e:
-            print(f"Error embedding query: {e}")
-            return []
+        version = self.local_store.version(user_id)
+        if self._cv_versions.get(user_id) != version:
+            self.retrieval_cache.invalidate(user_id)
+            self._cv_versions[user_id] = version
+        return version
+
+    def cv_facts(self, user_id: str) -> Dict[str, Any]:
+        """Facts stored with the user's indexed CV (empty if unavailable in this process)."""
+        return self.local_store.facts(user_id)
 
-        # 2. Define Filter
-        user_filter = models.Filter(
+    def _lexical_only_search(self, query: str, user_id: str, k: int) -> Optional[List[Document]]:
+        """
+        BM25-only results for keyword queries, or None if the query needs embedding search
+        (no keyword in the query, or the CV never uses it, e.g. "Tel:" for a "Phone" field).
+        """
+        keywords = [term for term in query_terms(query) if term in LEXICAL_ONLY_KEYWORDS]
+        if not keywords:
+            return None
+        return self.local_store.lexical_search(user_id, query, k=k, required_terms=keywords)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _user_filter(user_id: str) -> models.Filter:
+        """
+        Returns the payload filter restricting a search to one user's chunks.
+        Built (and validated) once per user, then shared by all queries; never mutate it.
+        """
+        return models.Filter(
             must=[
                 models.FieldCondition(
                     key="metadata.user_id",
@@ -140,38 +408,232 @@ class RAGManager:
             ]
         )
 
+    async def _store_chunk_text(self, user_id: str, point_ids: List[str], chunks: List[Document]) -> bool:
+        """Replaces the user's chunk texts in the text store; returns False if there is none."""
+        if self.text_store is None:
+            return False
+        try:
+            async with self.text_store.pipeline(transaction=True) as pipe:
+                pipe.delete(chunk_text_key(user_id))
+                pipe.hset(chunk_text_key(user_id), mapping={
+                    point_id: chunk.page_content for point_id, chunk in zip(point_ids, chunks)
+                })
+                await pipe.execute()
+            return True
+        except Exception as e:
+            print(f"Could not store chunk text for user {user_id}, keeping it in Qdrant: {e}")
+            return False
+
+    async def _points_to_documents(self, user_id: str, point_lists) -> List[List[Document]]:
+        """
+        Converts lists of Qdrant scored points back into LangChain Documents.
+        Text missing from the payloads is fetched from the text store in one HMGET.
+        """
+        missing = [
+            str(point.id)
+            for points in point_lists for point in points
+            if "page_content" not in (getattr(point, "payload", None) or {})
+        ]
+        texts = {}
+        if missing and self.text_store is not None:
+            try:
+                texts = dict(zip(missing, await self.text_store.hmget(chunk_text_key(user_id), missing)))
+            except Exception as e:
+                print(f"Error fetching chunk text for user {user_id}: {e}")
+
+        results = []
+        for points in point_lists:
+            docs = []
+            for point in points:
+                payload = getattr(point, "payload", {}) or {}
+                content = payload.get("page_content") or texts.get(str(point.id)) or ""
+                meta = payload.get("metadata", {})
+                docs.append(Document(page_content=content, metadata=meta))
+            results.append(docs)
+        return results
+
+    async def query_vector_store(self,
+                                 query: str,
+                                 user_id: str,
+                                 k: int = 3,
+                                 hnsw_ef: Optional[int] = None) -> List[Document]:
+        """
+        Queries the vector store using raw Qdrant Client to avoid LangChain wrapper issues.
+        """
+        # 0. Keyword queries are answered lexically, without embedding the query
+        self.cv_version(user_id)
+        docs = self._lexical_only_search(query, user_id, k)
+        if docs is not None:
+            print(f"Found {len(docs)} lexical results for user {user_id}: '{query}'")
+            return docs
+
+        # 1. Embed query (memoized in memory and on disk)
+        try:
+            query_vector = await asyncio.to_thread(self.embedding_cache.embed, query)
+        except Exception as e:
+            print(f"Error embedding query: {e}")
+            return []
+
+        # 2. Reuse results of a near-identical earlier query
+        docs = self._cached_documents(user_id, query_vector, k)
+        if docs is not None:
+            print(f"Found {len(docs)} cached results for user {user_id}: '{query}'")
+            return docs
+
+        # 3. Search the in-process copy if we have one (no network hop)
+        if self.local_store.has(user_id):
+            docs = self.local_store.search(user_id, query_vector, k=k, query_text=query)
+            print(f"Found {len(docs)} local results for user {user_id}: '{query}'")
+            if docs:
+                self.retrieval_cache.add(user_id, query, query_vector, (k, docs))
+            return docs
+
+        # 4. Define Filter
+        user_filter = self._user_filter(user_id)
+
         print(f"Querying Qdrant for user {user_id}: '{query}'")
         
         try:
-            # 3. Execute Search via Client directly
+            # 5. Execute Search via Client directly
             # This bypasses the AttributeError: 'QdrantClient' object has no attribute 'search'
             # which happens inside the LangChain wrapper due to version mismatch.
-            response = self.client.query_points(
+            response = await self.client.query_points(
             collection_name=self.collection_name,
-            query=query_vector,
-            using="user-information",  # optional, only if using named vector
+            query=list(map(float, query_vector)),
+            using=VECTOR_NAME,
             query_filter=user_filter,
-            with_payload=True,
-            with_vectors=True,
+            search_params=search_params(k, hnsw_ef),
+            with_payload=PAYLOAD_SELECTOR,
+            with_vectors=False,
             limit=k
             )
 
-            # 4. Extract hits
+            # 6. Extract hits
             points = getattr(response, "points", None)
             if points is None:
                 # Some versions also use .result
                 points = getattr(response, "result", [])
 
-            docs = []
-            for point in points:
-                payload = getattr(point, "payload", {}) or {}
-                content = payload.get("page_content", "")
-                meta = payload.get("metadata", {})
-                docs.append(Document(page_content=content, metadata=meta))
+            docs = (await self._points_to_documents(user_id, [points]))[0]
+            if docs:
+                self.retrieval_cache.add(user_id, query, query_vector, (k, docs))
 
             print(f"Found {len(docs)} results.")
             return docs
 
         except Exception as e:
             print(f"Error during query: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def embed_queries(self, queries: List[str]) -> List[np.ndarray]:
+        """Embeds several queries; cached ones are read from the cache, the rest go in one request."""
+        if not queries:
+            return []
+        return self.embedding_cache.embed_many(queries)
+
+    async def query_vector_store_batch(self,
+                                       queries: List[str],
+                                       user_id: str,
+                                       k: int = 3,
+                                       query_vectors: Optional[List[np.ndarray]] = None,
+                                       hnsw_ef: Optional[int] = None) -> List[List[Document]]:
+        """
+        Queries the vector store for several queries at once.
+
+        All queries are embedded in a single embeddings request and searched with a
+        single Qdrant batch request, instead of one round-trip of each per query.
+
+        Args:
+            queries: Query strings to search for.
+            user_id: Only chunks belonging to this user are searched.
+            k: Number of documents to return per query.
+            query_vectors: Precomputed embeddings for `queries`, if the caller already has them.
+            hnsw_ef: Qdrant search beam width (defaults to max(64, 4*k); raise for better recall).
+
+        Returns:
+            One list of Documents per query, in the same order as `queries`.
+        """
+        if not queries:
+            return []
+        results: List[Optional[List[Document]]] = [None] * len(queries)
+        self.cv_version(user_id)
+
+        # 1. Keyword queries are answered lexically, without embedding
+        if self.local_store.has(user_id):
+            results = [self._lexical_only_search(query, user_id, k) for query in queries]
+        missing = [i for i, docs in enumerate(results) if docs is None]
+
+        # 2. Embed the remaining queries in one request
+        if query_vectors is None:
+            try:
+                vectors = dict(zip(missing, await asyncio.to_thread(
+                    self.embed_queries, [queries[i] for i in missing]
+                )))
+            except Exception as e:
+                print(f"Error embedding queries: {e}")
+                return [docs or [] for docs in results]
+        else:
+            vectors = {i: query_vectors[i] for i in missing}
+
+        # 3. Reuse results of near-identical earlier queries
+        for i in missing:
+            results[i] = self._cached_documents(user_id, vectors[i], k)
+        missing = [i for i in missing if results[i] is None]
+
+        # 4. Search the in-process copy if we have one (no network hop), else Qdrant
+        if missing:
+            if self.local_store.has(user_id):
+                found = [
+                    self.local_store.search(user_id, vectors[i], k=k, query_text=queries[i])
+                    for i in missing
+                ]
+            else:
+                found = await self._query_qdrant_batch([vectors[i] for i in missing], user_id, k, hnsw_ef)
+            for i, docs in zip(missing, found):
+                results[i] = docs
+                if docs:
+                    self.retrieval_cache.add(user_id, queries[i], vectors[i], (k, docs))
+
+        return results
+
+    def _cached_documents(self, user_id: str, vector: np.ndarray, k: int) -> Optional[List[Document]]:
+        """Documents retrieved earlier for a near-identical query (with at least k results)."""
+        cached = self.retrieval_cache.lookup(user_id, vector)
+        if cached is None:
+            return None
+        cached_k, docs = cached
+        return docs[:k] if cached_k >= k else None
+
+    async def _query_qdrant_batch(self,
+                                  query_vectors: List[np.ndarray],
+                                  user_id: str,
+                                  k: int,
+                                  hnsw_ef: Optional[int] = None) -> List[List[Document]]:
+        """Searches Qdrant for several query vectors in one round-trip."""
+        # Define Filter (shared by every request in the batch)
+        user_filter = self._user_filter(user_id)
+
+        print(f"Batch querying Qdrant for user {user_id}: {len(query_vectors)} queries")
+
+        try:
+            # Execute all searches in one round-trip
+            responses = await self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=[
+                    models.QueryRequest(
+                        query=list(map(float, vector)),
+                        using=VECTOR_NAME,
+                        filter=user_filter,
+                        params=search_params(k, hnsw_ef),
+                        with_payload=PAYLOAD_SELECTOR,
+                        with_vector=False,
+                        limit=k,
+                    )
+                    for vector in query_vectors
+                ],
+            )
+            return await self._points_to_documents(user_id, [response.points for response in responses])
+
+        except Exception as e:
+            print(f"Error during batch query: {e}")
+            return [[] for _ in query_vectors]
@@ -0,0 +1,96 @@
+"""
+Per-user semantic caches keyed by prompt embeddings.
+Lookups match by cosine similarity, so paraphrased labels ("First Name" / "Given name")
+reuse an earlier result: generated answers (skipping the LLM) or retrieved CV chunks
+(skipping the vector search).
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from .lru import LRUDict
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+
+# Entries kept per user; beyond this the oldest entry is overwritten
+DEFAULT_MAX_ENTRIES = 1024
+
+# Rows allocated for a user's first entries; the buffer doubles up to the cap
+INITIAL_CAPACITY = 64
+
+# Users kept per cache; a full user holds ~6 MB of 1536-dim float32 rows, and the least
+# recently used user is dropped beyond this
+DEFAULT_MAX_USERS = 64
+
+class _UserEntries:
+    """Growable ring buffer of unit-normalized embeddings and their (prompt, value) pairs."""
+
+    def __init__(self, dim: int, max_entries: int):
+        self.matrix = np.empty((min(INITIAL_CAPACITY, max_entries), dim), dtype=np.float32)
+        self.items: List[Tuple[str, Any]] = []
+        self.max_entries = max_entries
+        # Next row to overwrite once the buffer is full (FIFO eviction)
+        self.cursor = 0
+
+    def add(self, row: np.ndarray, item: Tuple[str, Any]):
+        size = len(self.items)
+        if size < self.max_entries:
+            if size == len(self.matrix):
+                grown = np.empty((min(2 * size, self.max_entries), self.matrix.shape[1]), dtype=np.float32)
+                grown[:size] = self.matrix
+                self.matrix = grown
+            self.matrix[size] = row
+            self.items.append(item)
+        else:
+            self.matrix[self.cursor] = row
+            self.items[self.cursor] = item
+            self.cursor = (self.cursor + 1) % self.max_entries
+
+    def similarities(self, vector: np.ndarray) -> np.ndarray:
+        return self.matrix[:len(self.items)] @ vector
+
+class SemanticCache:
+    """In-memory (prompt embedding -> value) cache, partitioned by user_id."""
+
+    def __init__(self,
+                 threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_users: int = DEFAULT_MAX_USERS):
+        """
+        Args:
+            threshold: Minimum cosine similarity for a cached entry to count as a hit.
+            max_entries: Entries kept per user before the oldest ones are evicted.
+            max_users: Users kept before the least recently used one is evicted.
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries: Dict[str, _UserEntries] = LRUDict(max_users)
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def lookup(self, user_id: str, vector: Sequence[float]) -> Optional[Any]:
+        """Returns the cached value closest to `vector`, or None on a miss."""
+        entries = self._entries.get(user_id)
+        if entries is None:
+            return None
+        sims = entries.similarities(self._normalize(vector))
+        best = int(np.argmax(sims))
+        if sims[best] >= self.threshold:
+            return entries.items[best][1]
+        return None
+
+    def add(self, user_id: str, prompt: str, vector: Sequence[float], value: Any):
+        """Stores a value for the prompt embedded as `vector`."""
+        row = self._normalize(vector)
+        entries = self._entries.get(user_id)
+        if entries is None:
+            entries = self._entries[user_id] = _UserEntries(len(row), self.max_entries)
+        entries.add(row, (prompt, value))
+
+    def invalidate(self, user_id: str):
+        """Drops every cached value for a user (e.g. after a new CV upload)."""
+        self._entries.pop(user_id, None)
@@ -1,11 +1,19 @@
 import os
 import sys
-import shutil
 import asyncio
+import aiofiles
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
 from fastapi import FastAPI, UploadFile, File, HTTPException, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
-from .agent import AutofillAgent
+from .agent_pool import AgentPool
+from .config import PDF_WORKERS, ALLOWED_ORIGIN_REGEX
+from .http_clients import close_http_clients
+from .redis_client import close_redis_client
+from .retrieve_info_from_pdf import close_clients as close_rag_clients
 
 # Fix for Windows Event Loop if running directly (though we are removing playwright backend)
 if sys.platform == 'win32':
@@ -13,27 +21,47 @@ if sys.platform == 'win32':
 
 app = FastAPI(title="Autofill Agent API")
 
+# Uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1 << 20
+
 # Add CORS so the browser extension can call this API
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"], # For development. In prod, strict limit to extension ID.
+    allow_origin_regex=ALLOWED_ORIGIN_REGEX,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-agent = AutofillAgent()
+# Action lists for large forms compress well; small responses are sent as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# One shared agent; requests are serialized per user only
+agents = AgentPool()
 
 class ProcessPageRequest(BaseModel):
     url: str
     html: str
     user_id: str
 
+# Declared response models let FastAPI serialize responses straight to JSON with Pydantic
+class FormAction(BaseModel):
+    selector: str
+    action: str
+    value: str
+    type: str
+
+class ProcessPageResponse(BaseModel):
+    actions: List[FormAction]
+
+class UploadResponse(BaseModel):
+    message: str
+
 @app.get("/")
 def read_root():
     return {"status": "Autofill Agent API is running"}
 
-@app.post("/upload_cv")
+@app.post("/upload_cv", response_model=UploadResponse)
 async def upload_cv(
     file: UploadFile = File(...), 
     user_id: str = Form(...)
@@ -43,34 +71,48 @@ async def upload_cv(
     """
     try:
         file_location = f"temp_{user_id}_{file.filename}"
-        with open(file_location, "wb+") as file_object:
-            shutil.copyfileobj(file.file, file_object)
-        
-        agent.process_pdf(file_location, user_id=user_id)
-        os.remove(file_location)
+        # Docling reads from a path; stream the upload there without blocking the event loop
+        async with aiofiles.open(file_location, "wb") as file_object:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await file_object.write(chunk)
+
+        try:
+            async with agents.session(user_id) as agent:
+                await agent.process_pdf(file_location, user_id=user_id, executor=app.state.executor)
+        finally:
+            os.remove(file_location)
         
         return {"message": f"Successfully processed {file.filename} for user {user_id}"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/process_page")
+@app.post("/process_page", response_model=ProcessPageResponse)
 async def process_page(request: ProcessPageRequest):
     """
     Receives HTML from the extension, decides what to fill, and returns actions.
     """
     try:
-        actions = await agent.generate_form_actions(request.html, request.user_id)
+        async with agents.session(request.user_id) as agent:
+            actions = await agent.generate_form_actions(request.html, request.user_id)
         return {"actions": actions}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.on_event("startup")
 async def startup_event():
-    pass
+    # Docling parsing is CPU-bound; run it in worker processes, off the event loop and GIL.
+    # Spawned rather than forked: the server process already runs threads (Numba, HTTP pools)
+    app.state.executor = ProcessPoolExecutor(
+        max_workers=PDF_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    pass
+    app.state.executor.shutdown(wait=False, cancel_futures=True)
+    await close_rag_clients()
+    await close_redis_client()
+    await close_http_clients()
 
 if __name__ == "__main__":
     import uvicorn
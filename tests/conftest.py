@@ -0,0 +1,110 @@
+import os
+import re
+import json
+import hashlib
+import tempfile
+
+# Keep the on-disk caches of the test run out of the user's cache directory
+os.environ["AUTOFILL_CACHE_DIR"] = tempfile.mkdtemp(prefix="autofill_test_")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.pop("REDIS_URL", None)
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+from qdrant_client import AsyncQdrantClient
+
+CV_MARKDOWN = """# Jane Doe
+jane@x.org | +49 151 2345678 | https://github.com/jane
+
+## Education
+MSc Computer Science, TU Berlin
+
+## Experience
+Software engineer at ACME GmbH
+"""
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic embeddings: the same text (up to a trailing '?') gets the same vector."""
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+        self.vectors = {}  # text -> fixed vector, e.g. to make a query match a chunk
+
+    def _vector(self, text: str):
+        if text in self.vectors:
+            return list(self.vectors[text])
+        seed = int(hashlib.md5(text.rstrip("?").lower().encode()).hexdigest()[:8], 16)
+        return np.random.default_rng(seed).normal(size=32).tolist()
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("embeddings unavailable")
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts):
+        return self.embed_documents(texts)
+
+class FakeResponse:
+    def __init__(self, content: str):
+        self.content = content
+
+class FakeLLM:
+    """Answers every field with `answers.get(label, default)` in the JSON reply format."""
+
+    def __init__(self, answers=None, default="SKIP"):
+        self.answers = answers or {}
+        self.default = default
+        self.calls = 0
+        self.reply = None  # raw reply override, e.g. unparseable text
+        self.prompts = []
+
+    async def ainvoke(self, messages, **kwargs):
+        self.calls += 1
+        self.prompts.append(messages[1].content)
+        if self.reply is not None:
+            return FakeResponse(self.reply)
+        fields = json.loads(re.search(r"Form Fields:\s*(\[.*?\])\n", messages[1].content, re.S).group(1))
+        return FakeResponse(json.dumps({"values": [
+            {"id": field["id"], "value": self.answers.get(field["label"], self.default)}
+            for field in fields
+        ]}))
+
+@pytest.fixture
+def embeddings():
+    return FakeEmbeddings()
+
+@pytest.fixture
+def qdrant():
+    return AsyncQdrantClient(":memory:")
+
+@pytest.fixture
+def rag_manager(monkeypatch, tmp_path, embeddings, qdrant):
+    """RAGManager on an in-memory Qdrant with fake embeddings and a fresh local store."""
+    from autofill_agent import retrieve_info_from_pdf
+    from autofill_agent.embedding_cache import EmbeddingCache
+    from autofill_agent.local_vector_store import LocalVectorStore
+
+    monkeypatch.setattr(retrieve_info_from_pdf, "get_embedding_model", lambda: embeddings)
+    monkeypatch.setattr(retrieve_info_from_pdf, "get_qdrant_client", lambda: qdrant)
+    manager = retrieve_info_from_pdf.RAGManager(collection_name="test-collection")
+    manager.embedding_cache = EmbeddingCache(embeddings, directory=tmp_path / "emb")
+    manager.local_store = LocalVectorStore(cache_dir=tmp_path / "vectors")
+    return manager
+
+@pytest.fixture
+def agent(monkeypatch, tmp_path, rag_manager):
+    """AutofillAgent wired to the fake RAG stack and a FakeLLM (see `agent.llm`)."""
+    from autofill_agent import agent as agent_module
+    from autofill_agent.form_plans import FormPlanCache
+
+    monkeypatch.setattr(agent_module, "RAGManager", lambda: rag_manager)
+    autofill_agent = agent_module.AutofillAgent()
+    autofill_agent.llm = FakeLLM()
+    autofill_agent.form_plans = FormPlanCache(directory=tmp_path / "form_plans")
+    return autofill_agent
@@ -0,0 +1,134 @@
+import asyncio
+
+from autofill_agent.agent import AutofillAgent, _shrink
+
+def test_answer_key_includes_field_details():
+    key = AutofillAgent._answer_key_for_field(
+        {"label": "Country", "name": "country", "type": "select", "options": ["Germany", "France"]}
+    )
+    assert "Country" in key and "country" in key and "select" in key and "Germany" in key
+
+def test_answer_key_skips_ambiguous_fields():
+    assert AutofillAgent._answer_key_for_field({"label": "Yes", "type": "radio", "name": "sponsor"}) is None
+    assert AutofillAgent._answer_key_for_field({"label": "field_4", "type": "text"}) is None
+
+def test_shrink_keeps_short_text():
+    assert _shrink("Berlin, Germany", {"city"}, limit=50) == "Berlin, Germany"
+
+def test_shrink_starts_at_matching_sentence():
+    text = "Led a team of five. " * 10 + "Graduated from TU Berlin in 2018. " + "Other. " * 20
+    shrunk = _shrink(text, {"graduated"}, limit=40)
+    assert shrunk.startswith("Graduated from TU Berlin")
+    assert len(shrunk) <= 40
+
+def test_shrink_without_match_keeps_beginning():
+    text = "a" * 100
+    assert _shrink(text, {"missing"}, limit=10) == "a" * 10
+
+FORM = """<form>
+<label for="uni">University</label><input id="uni" type="text" name="university">
+</form>"""
+
+async def _index_cv(agent, user_id="u1"):
+    from autofill_agent.load_and_process_pdf import iter_split_markdown
+    from tests.conftest import CV_MARKDOWN
+    await agent.rag_manager.initialize_vector_store(iter_split_markdown(CV_MARKDOWN, "cv.pdf"), user_id=user_id)
+
+def test_unparseable_llm_reply_is_not_cached(agent):
+    async def _run():
+        await _index_cv(agent)
+        agent.llm.reply = "not json"
+        first = await agent.generate_form_actions(FORM, "u1")
+        agent.llm.reply = None
+        agent.llm.answers = {"University": "TU Berlin"}
+        second = await agent.generate_form_actions(FORM, "u1")
+        return first, second
+
+    first, second = asyncio.run(_run())
+    assert first == []
+    assert [action["value"] for action in second] == ["TU Berlin"]
+    assert agent.llm.calls == 2
+
+def test_answers_without_context_are_not_cached(agent, monkeypatch):
+    async def _no_context(queries, user_id, **kwargs):
+        return [[] for _ in queries]
+
+    async def _run():
+        await _index_cv(agent)
+        # Failed retrieval: the LLM answers without CV context
+        with monkeypatch.context() as patch:
+            patch.setattr(agent.rag_manager, "query_vector_store_batch", _no_context)
+            first = await agent.generate_form_actions(FORM, "u1")
+        agent.llm.answers = {"University": "TU Berlin"}
+        second = await agent.generate_form_actions(FORM, "u1")
+        return first, second
+
+    first, second = asyncio.run(_run())
+    assert first == []
+    assert [action["value"] for action in second] == ["TU Berlin"]
+    assert agent.llm.calls == 2
+
+def test_profile_extraction_is_skipped_without_redis(agent):
+    assert agent.profiles.client is None
+    asyncio.run(agent.extract_profile_fields("u1"))
+    assert agent.llm.calls == 0
+    assert agent.rag_manager.embedding_cache.embedding_model.calls == 0
+
+def test_cv_facts_survive_a_restart(agent):
+    from autofill_agent.load_and_process_pdf import extract_user_facts, iter_split_markdown
+    from autofill_agent.local_vector_store import LocalVectorStore
+    from tests.conftest import CV_MARKDOWN
+
+    async def _run():
+        await agent.rag_manager.initialize_vector_store(
+            iter_split_markdown(CV_MARKDOWN, "cv.pdf"), user_id="u1", facts=extract_user_facts(CV_MARKDOWN),
+        )
+        # Simulate a fresh process: empty in-memory state, same on-disk store
+        agent.rag_manager.local_store = LocalVectorStore(cache_dir=agent.rag_manager.local_store.cache_dir)
+        agent.user_facts.clear()
+        agent._cv_versions.clear()
+        return await agent.generate_form_actions('<form><input type="email" name="email"></form>', "u1")
+
+    actions = asyncio.run(_run())
+    assert [action["value"] for action in actions] == ["jane@x.org"]
+    assert agent.llm.calls == 0
+
+def test_repeated_fields_are_answered_from_the_cache(agent):
+    async def _run():
+        await _index_cv(agent)
+        agent.llm.answers = {"University": "TU Berlin"}
+        first = await agent.generate_form_actions(FORM, "u1")
+        # Same field on another page
+        second = await agent.generate_form_actions("<div>Apply</div>" + FORM, "u1")
+        return first, second
+
+    first, second = asyncio.run(_run())
+    assert first == second
+    assert [action["value"] for action in second] == ["TU Berlin"]
+    assert agent.llm.calls == 1
+
+def test_radio_answers_are_not_shared_between_questions(agent):
+    radios = """<form>
+    <p>Do you need visa sponsorship?</p><label><input type="radio" name="sponsorship">Yes</label>
+    <p>Have you been convicted?</p><label><input type="radio" name="convicted">Yes</label>
+    </form>"""
+
+    async def _run():
+        await _index_cv(agent)
+        agent.llm.answers = {"Yes": "true"}
+        await agent.generate_form_actions(radios, "u1")
+        await agent.generate_form_actions(radios, "u1")
+
+    asyncio.run(_run())
+    # Both calls went to the LLM: "Yes" radios are never answered from the cache
+    assert agent.llm.calls == 2
+
+def test_fields_are_answered_when_embeddings_fail(agent):
+    async def _run():
+        await _index_cv(agent)
+        agent.rag_manager.embedding_cache.embedding_model.fail = True
+        agent.llm.answers = {"University": "TU Berlin"}
+        return await agent.generate_form_actions(FORM, "u1")
+
+    actions = asyncio.run(_run())
+    assert [action["value"] for action in actions] == ["TU Berlin"]
@@ -0,0 +1,17 @@
+from autofill_agent import form_plans
+from autofill_agent.form_plans import FormPlanCache
+
+FIELDS = [{"selector": "#a", "type": "text", "label": "City"}]
+
+def test_fields_round_trip(tmp_path):
+    cache = FormPlanCache(directory=tmp_path)
+    assert cache.get_fields("<form></form>") is None
+    cache.put_fields("<form></form>", FIELDS)
+    assert cache.get_fields("<form></form>") == FIELDS
+    assert cache.get_fields("<form> </form>") is None
+
+def test_entries_of_another_analysis_version_are_ignored(tmp_path, monkeypatch):
+    cache = FormPlanCache(directory=tmp_path)
+    cache.put_fields("<form></form>", FIELDS)
+    monkeypatch.setattr(form_plans, "FORM_ANALYSIS_VERSION", form_plans.FORM_ANALYSIS_VERSION + 1)
+    assert cache.get_fields("<form></form>") is None
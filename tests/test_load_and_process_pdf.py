@@ -0,0 +1,88 @@
+import pytest
+from langchain.text_splitter import MarkdownHeaderTextSplitter
+
+from autofill_agent.load_and_process_pdf import (
+    Re2HeaderSplitter,
+    extract_user_facts,
+    greedy_split,
+    split_markdown,
+)
+
+HEADERS_TO_SPLIT_ON = [("#", "Header_1"), ("##", "Header_2"), ("###", "Header_3")]
+
+CV = """# Jane Doe
+jane@x.org | +49 151 2345678 | https://github.com/jane.
+
+## Experience
+ACME GmbH, 01.2019 - 03.2021
+"""
+
+def test_greedy_split_respects_size_and_overlap():
+    text = "\n".join(f"line {i:03d} " + "x" * 40 for i in range(100))
+    chunks = greedy_split(text, chunk_size=200, chunk_overlap=60)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    # Consecutive chunks share the carried-over trailing line
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert prev.splitlines()[-1] == nxt.splitlines()[0]
+    # Every line survives the split
+    assert {line for chunk in chunks for line in chunk.splitlines()} == set(text.splitlines())
+
+def test_greedy_split_breaks_over_long_lines():
+    chunks = greedy_split("word " * 100, chunk_size=50, chunk_overlap=0)
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert " ".join(chunks).split() == ["word"] * 100
+
+def _sections(docs):
+    return [(doc.metadata, doc.page_content) for doc in docs]
+
+@pytest.mark.parametrize("text", [
+    CV,
+    "intro\n# A\ntext a\n### A.1\ntext a1\n## B\ntext b\n# C\n",
+    # '#' lines inside code fences are content, not headers
+    "# Jane\nintro\n```bash\n# not a header\necho hi\n```\n## Skills\n```inline``` span\n"
+    "## Next\n~~~\n## also not\n~~~\ntext\n",
+])
+def test_re2_header_splitter_matches_langchain(text):
+    expected = MarkdownHeaderTextSplitter(headers_to_split_on=HEADERS_TO_SPLIT_ON).split_text(text)
+    actual = Re2HeaderSplitter(headers_to_split_on=HEADERS_TO_SPLIT_ON).split_text(text)
+    assert _sections(actual) == _sections(expected)
+
+def test_re2_header_splitter_ignores_headers_in_code_fences():
+    text = "# Projects\n```python\n# comment\nprint(1)\n```\n"
+    docs = Re2HeaderSplitter(headers_to_split_on=HEADERS_TO_SPLIT_ON).split_text(text)
+    assert len(docs) == 1
+    assert docs[0].metadata == {"Header_1": "Projects"}
+    assert "# comment" in docs[0].page_content
+
+def test_split_markdown_adds_source():
+    docs = split_markdown(CV, source="cv.pdf")
+    assert [doc.metadata for doc in docs] == [
+        {"Header_1": "Jane Doe", "source": "cv.pdf"},
+        {"Header_1": "Jane Doe", "Header_2": "Experience", "source": "cv.pdf"},
+    ]
+
+def test_extract_user_facts_contact_details():
+    facts = extract_user_facts(CV)
+    assert facts == {
+        "email": "jane@x.org",
+        "tel": "+49 151 2345678",
+        "url": ["https://github.com/jane"],
+    }
+
+@pytest.mark.parametrize("text, tel", [
+    ("Phone: (030) 1234 5678", "(030) 1234 5678"),
+    ("Tel. (+49) 30 1234567", "(+49) 30 1234567"),
+    ("Mobile: 030 1234 5678", "030 1234 5678"),
+])
+def test_extract_user_facts_phone_formats(text, tel):
+    assert extract_user_facts(text)["tel"] == tel
+
+@pytest.mark.parametrize("text", [
+    "Work: 01.2019 - 03.2021 at ACME",  # dotted date range
+    "2019-2021 2021-2023",
+    "Student ID 123456789",  # no '+' and no phone label
+    "+49 151 2345678\nMobile: +44 20 7946 0958",  # ambiguous: two numbers
+])
+def test_extract_user_facts_rejects_non_phones(text):
+    assert "tel" not in extract_user_facts(text)
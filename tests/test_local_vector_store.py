@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+from langchain.schema import Document
+
+from autofill_agent.local_vector_store import LocalVectorStore, quantize_int8
+
+DOCS = [
+    Document(page_content="Python, SQL and Docker", metadata={"Header_2": "Skills"}),
+    Document(page_content="MSc Computer Science, TU Berlin", metadata={"Header_2": "Education"}),
+    Document(page_content="Software engineer at ACME", metadata={"Header_2": "Experience"}),
+]
+VECTORS = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+
+def test_search_returns_most_similar_chunks(tmp_path):
+    store = LocalVectorStore(cache_dir=tmp_path)
+    store.add("u1", DOCS, VECTORS)
+    assert store.has("u1")
+    assert not store.has("u2")
+    assert store.search("u1", [0.1, 0.9, 0.0], k=1) == [DOCS[1]]
+    assert store.search("u1", [0.0, 0.2, 0.9], k=2) == [DOCS[2], DOCS[1]]
+
+def test_store_is_loaded_from_disk(tmp_path):
+    LocalVectorStore(cache_dir=tmp_path).add("u1", DOCS, VECTORS)
+    store = LocalVectorStore(cache_dir=tmp_path)
+    assert store.search("u1", [1.0, 0.0, 0.0], k=1) == [DOCS[0]]
+
+def test_reindex_by_another_process_is_picked_up(tmp_path):
+    writer = LocalVectorStore(cache_dir=tmp_path)
+    reader = LocalVectorStore(cache_dir=tmp_path)
+    writer.add("u1", DOCS, VECTORS)
+    old_version = reader.version("u1")
+    assert old_version == writer.version("u1")
+
+    new_docs = [Document(page_content="Rust and Go", metadata={"Header_2": "Skills"})]
+    writer.add("u1", new_docs, [[1.0, 0.0, 0.0]])
+    # Guard against coarse filesystem timestamps
+    path = writer._path_for("u1")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert reader.version("u1") != old_version
+    assert reader.search("u1", [1.0, 0.0, 0.0], k=3) == new_docs
+
+def test_lexical_search(tmp_path):
+    store = LocalVectorStore(cache_dir=tmp_path)
+    store.add("u1", DOCS, VECTORS)
+    assert store.lexical_search("u1", "TU Berlin", k=1) == [DOCS[1]]
+    assert store.lexical_search("u1", "unrelated words", k=1) is None
+
+def test_lexical_search_ignores_prompt_stopwords(tmp_path):
+    store = LocalVectorStore(cache_dir=tmp_path)
+    store.add("u1", DOCS, VECTORS)
+    # Only "phone" counts, and no chunk mentions it
+    assert store.lexical_search("u1", "What is the Phone?", k=3) is None
+
+def test_lexical_search_requires_terms(tmp_path):
+    docs = [Document(page_content="Jane Doe, Tel: +49 151 2345678"), *DOCS]
+    store = LocalVectorStore(cache_dir=tmp_path)
+    store.add("u1", docs, [[0.5, 0.5, 0.0], *VECTORS])
+    assert store.lexical_search("u1", "What is the Tel number?", k=3, required_terms=["phone"]) is None
+    assert store.lexical_search("u1", "What is the Tel number?", k=3, required_terms=["tel"]) == [docs[0]]
+
+def test_facts_are_persisted_with_the_chunks(tmp_path):
+    LocalVectorStore(cache_dir=tmp_path).add("u1", DOCS, VECTORS, facts={"email": "jane@x.org"})
+    store = LocalVectorStore(cache_dir=tmp_path)
+    assert store.facts("u1") == {"email": "jane@x.org"}
+    assert store.facts("u2") == {}
+
+def test_evicted_users_are_reloaded_from_disk(tmp_path):
+    store = LocalVectorStore(cache_dir=tmp_path, max_users=1)
+    store.add("u1", DOCS, VECTORS, facts={"email": "jane@x.org"})
+    store.add("u2", DOCS[:1], VECTORS[:1])
+    assert list(store._stores) == ["u2"]
+    assert "u1" not in store._bm25 and "u1" not in store._facts
+    assert store.facts("u1") == {"email": "jane@x.org"}
+    assert store.search("u1", [0.0, 1.0, 0.0], k=1) == [DOCS[1]]
+
+def test_quantize_int8_round_trip():
+    matrix = np.random.default_rng(0).normal(size=(20, 64)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    quantized, scale = quantize_int8(matrix)
+    assert quantized.dtype == np.int8
+    assert scale.shape == (20,)
+    np.testing.assert_allclose(quantized * scale[:, None], matrix, atol=scale.max())
+
+def test_quantize_int8_zero_row():
+    quantized, scale = quantize_int8(np.zeros((1, 4), dtype=np.float32))
+    assert not quantized.any()
+    assert scale[0] == 1.0
@@ -0,0 +1,20 @@
+from autofill_agent.lru import LRUDict
+
+def test_least_recently_used_key_is_evicted():
+    evicted = []
+    users = LRUDict(2, on_evict=lambda key, value: evicted.append((key, value)))
+    users["a"] = 1
+    users["b"] = 2
+    assert users["a"] == 1  # "a" is now the most recently used
+    users["c"] = 3
+    assert list(users) == ["a", "c"]
+    assert evicted == [("b", 2)]
+
+def test_get_refreshes_recency():
+    users = LRUDict(2)
+    users["a"] = 1
+    users["b"] = 2
+    assert users.get("a") == 1
+    assert users.get("missing", 0) == 0
+    users["c"] = 3
+    assert "a" in users and "b" not in users
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from autofill_agent.profile_store import ProfileStore, profile_field_key
+from autofill_agent.redis_client import get_redis_client
+
+@pytest.mark.parametrize("field, key", [
+    ({"label": "First Name", "type": "text"}, "first_name"),
+    ({"label": "first-name", "type": "text"}, "first_name"),
+    ({"label": "E-Mail Address:", "type": "email"}, "e_mail_address"),
+    ({"label": "Country", "type": "select"}, "country"),
+    ({"label": "City", "type": "input"}, "city"),  # <input> without a type attribute
+])
+def test_profile_field_key(field, key):
+    assert profile_field_key(field) == key
+
+@pytest.mark.parametrize("field", [
+    {"label": "Yes", "type": "radio"},
+    {"label": "Willing to relocate", "type": "checkbox"},
+    {"label": "Password", "type": "password"},
+    {"label": "Yes", "type": "text"},
+    {"label": "field_3", "type": "text"},
+    {"label": None, "type": "text"},
+    {"label": "???", "type": "text"},
+])
+def test_profile_field_key_rejects_unspecific_fields(field):
+    assert profile_field_key(field) is None
+
+def test_profile_store_without_redis_is_a_no_op(monkeypatch):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    get_redis_client.cache_clear()
+    store = ProfileStore()
+    assert store.client is None
+
+    async def _run():
+        await store.put_many("u1", {"first_name": "Jane"})
+        return await store.get_many("u1", ["first_name", "city"])
+
+    assert asyncio.run(_run()) == [None, None]
+
+def test_profile_store_shares_the_process_redis_client(monkeypatch):
+    pytest.importorskip("redis")
+    monkeypatch.setenv("REDIS_URL", "redis://localhost:6379/0")
+    get_redis_client.cache_clear()
+    try:
+        assert ProfileStore().client is get_redis_client() is not None
+    finally:
+        get_redis_client.cache_clear()
+
+def test_answered_fields_are_reused_on_other_forms(agent):
+    fakeredis = pytest.importorskip("fakeredis")
+    from autofill_agent.load_and_process_pdf import iter_split_markdown
+    from tests.conftest import CV_MARKDOWN
+
+    agent.profiles.client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    agent.llm.answers = {"City": "Berlin"}
+
+    async def _run():
+        await agent.rag_manager.initialize_vector_store(iter_split_markdown(CV_MARKDOWN, "cv.pdf"), user_id="u1")
+        await agent.generate_form_actions(
+            '<form><label for="c">City</label><input id="c" type="text" name="city"></form>', "u1",
+        )
+        agent.answer_cache.invalidate("u1")
+        # Another site: different name, no type attribute, same label
+        return await agent.generate_form_actions(
+            '<form><label for="t">City</label><input id="t" name="town"></form>', "u1",
+        )
+
+    actions = asyncio.run(_run())
+    assert [action["value"] for action in actions] == ["Berlin"]
+    assert agent.llm.calls == 1
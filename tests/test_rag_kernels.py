@@ -0,0 +1,27 @@
+import numpy as np
+
+from autofill_agent.local_vector_store import quantize_int8
+from autofill_agent.rag_kernels import topk_cosine_int8
+
+def _unit_rows(rows: int, dim: int, seed: int = 0) -> np.ndarray:
+    matrix = np.random.default_rng(seed).normal(size=(rows, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+def test_topk_cosine_int8_matches_float_ranking():
+    matrix = _unit_rows(200, 64)
+    query = _unit_rows(1, 64, seed=1)[0]
+    matrix_q, scale = quantize_int8(matrix)
+    query_q, query_scale = quantize_int8(query)
+
+    indices, sims = topk_cosine_int8(matrix_q, scale, query_q, query_scale, k=5)
+
+    expected = matrix @ query
+    assert list(indices) == list(np.argsort(-expected)[:5])
+    np.testing.assert_allclose(sims, expected[indices], atol=0.02)
+    assert all(a >= b for a, b in zip(sims, sims[1:]))
+
+def test_topk_cosine_int8_k_larger_than_rows():
+    matrix_q, scale = quantize_int8(_unit_rows(3, 8))
+    query_q, query_scale = quantize_int8(_unit_rows(1, 8, seed=1)[0])
+    indices, _ = topk_cosine_int8(matrix_q, scale, query_q, query_scale, k=10)
+    assert sorted(indices) == [0, 1, 2]
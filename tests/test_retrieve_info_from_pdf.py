@@ -0,0 +1,101 @@
+import asyncio
+
+import numpy as np
+import xxhash
+
+from autofill_agent.load_and_process_pdf import iter_split_markdown
+from autofill_agent.local_vector_store import LocalVectorStore
+from autofill_agent.retrieve_info_from_pdf import header_hash
+from tests.conftest import CV_MARKDOWN
+
+def test_header_hash_is_xxh64():
+    assert header_hash("Education") == xxhash.xxh64_hexdigest(b"Education")
+    assert len(header_hash("Education")) == 16
+
+def test_indexed_chunks_carry_header_hashes(rag_manager):
+    indexed, _ = asyncio.run(rag_manager._aembed_and_upsert(iter_split_markdown(CV_MARKDOWN, "cv.pdf"), "u1"))
+    education = next(doc for doc in indexed if doc.metadata.get("Header_2") == "Education")
+    assert education.metadata["Header_1_h"] == header_hash("Jane Doe")
+    assert education.metadata["Header_2_h"] == header_hash("Education")
+
+def test_unchanged_chunks_are_not_embedded_again(rag_manager, embeddings):
+    asyncio.run(rag_manager._aembed_and_upsert(iter_split_markdown(CV_MARKDOWN, "cv.pdf"), "u1"))
+    calls = embeddings.calls
+    asyncio.run(rag_manager._aembed_and_upsert(iter_split_markdown(CV_MARKDOWN, "cv.pdf"), "u1"))
+    assert embeddings.calls == calls
+
+def test_chunks_removed_from_the_cv_are_deleted(rag_manager):
+    async def _run():
+        await rag_manager._aembed_and_upsert(iter_split_markdown(CV_MARKDOWN, "cv.pdf"), "u1")
+        await rag_manager._aembed_and_upsert(iter_split_markdown(CV_MARKDOWN, "cv.pdf"), "u2")
+        shorter = CV_MARKDOWN.split("## Experience")[0]
+        indexed, _ = await rag_manager._aembed_and_upsert(iter_split_markdown(shorter, "cv.pdf"), "u1")
+        counts = [
+            (await rag_manager.client.count(
+                rag_manager.collection_name, count_filter=rag_manager._user_filter(user_id),
+            )).count
+            for user_id in ("u1", "u2")
+        ]
+        return len(indexed), counts
+
+    indexed, counts = asyncio.run(_run())
+    assert counts == [indexed, 3]
+
+EDUCATION = "MSc Computer Science, TU Berlin"
+
+def _index(rag_manager, markdown=CV_MARKDOWN, user_id="u1"):
+    asyncio.run(rag_manager.initialize_vector_store(iter_split_markdown(markdown, "cv.pdf"), user_id=user_id))
+
+def _contents(results):
+    return [[doc.page_content for doc in docs] for docs in results]
+
+def test_batch_query_searches_the_local_store(rag_manager, embeddings):
+    embeddings.vectors["What is the Education?"] = embeddings._vector(EDUCATION)
+    _index(rag_manager)
+    calls = embeddings.calls
+    results = asyncio.run(rag_manager.query_vector_store_batch(
+        ["What is the Education?", "What is the Employer?"], "u1", k=1,
+    ))
+    assert _contents(results)[0] == [EDUCATION]
+    assert len(results[1]) == 1
+    # Both queries were embedded in one request
+    assert embeddings.calls == calls + 1
+
+def test_batch_query_falls_back_to_qdrant(rag_manager, embeddings, tmp_path):
+    embeddings.vectors["What is the Education?"] = embeddings._vector(EDUCATION)
+    _index(rag_manager)
+    # A process without the local copy searches Qdrant
+    rag_manager.local_store = LocalVectorStore(cache_dir=tmp_path / "other")
+    results = asyncio.run(rag_manager.query_vector_store_batch(["What is the Education?"], "u1", k=1))
+    assert _contents(results) == [[EDUCATION]]
+    assert results[0][0].metadata["user_id"] == "u1"
+    assert asyncio.run(rag_manager.query_vector_store_batch(["What is the Education?"], "u2", k=1)) == [[]]
+
+def test_batch_query_reuses_earlier_retrievals(rag_manager, monkeypatch):
+    _index(rag_manager)
+    searches = []
+    search = rag_manager.local_store.search
+    monkeypatch.setattr(rag_manager.local_store, "search", lambda *a, **kw: searches.append(a) or search(*a, **kw))
+    first = asyncio.run(rag_manager.query_vector_store_batch(["What is the Employer?"], "u1", k=2))
+    second = asyncio.run(rag_manager.query_vector_store_batch(["What is the Employer?"], "u1", k=2))
+    assert first == second
+    assert len(searches) == 1
+    # Fewer results than asked for earlier are not reused
+    asyncio.run(rag_manager.query_vector_store_batch(["What is the Employer?"], "u1", k=3))
+    assert len(searches) == 2
+
+def test_batch_query_uses_precomputed_vectors(rag_manager, embeddings):
+    _index(rag_manager)
+    calls = embeddings.calls
+    results = asyncio.run(rag_manager.query_vector_store_batch(
+        ["What is the Education?"], "u1", k=1, query_vectors=[np.asarray(embeddings._vector(EDUCATION))],
+    ))
+    assert _contents(results) == [[EDUCATION]]
+    assert embeddings.calls == calls
+
+def test_batch_query_answers_keyword_queries_lexically(rag_manager, embeddings):
+    _index(rag_manager, markdown=CV_MARKDOWN + "\n## Contact\nE-Mail: jane@x.org\n\n## Skills\nPython, SQL\n")
+    calls = embeddings.calls
+    results = asyncio.run(rag_manager.query_vector_store_batch(["What is the E-mail?"], "u1", k=3))
+    assert _contents(results) == [["E-Mail: jane@x.org"]]
+    assert embeddings.calls == calls
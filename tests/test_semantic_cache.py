@@ -0,0 +1,43 @@
+import numpy as np
+
+from autofill_agent.semantic_cache import SemanticCache
+
+def test_lookup_matches_similar_vectors_only():
+    cache = SemanticCache(threshold=0.95)
+    cache.add("u1", "First name", [1.0, 0.0, 0.0], "Jane")
+    assert cache.lookup("u1", [0.99, 0.05, 0.0]) == "Jane"
+    assert cache.lookup("u1", [0.0, 1.0, 0.0]) is None
+
+def test_entries_are_partitioned_by_user():
+    cache = SemanticCache()
+    cache.add("u1", "First name", [1.0, 0.0], "Jane")
+    assert cache.lookup("u2", [1.0, 0.0]) is None
+
+def test_invalidate_drops_user_entries():
+    cache = SemanticCache()
+    cache.add("u1", "First name", [1.0, 0.0], "Jane")
+    cache.add("u2", "First name", [1.0, 0.0], "John")
+    cache.invalidate("u1")
+    assert cache.lookup("u1", [1.0, 0.0]) is None
+    assert cache.lookup("u2", [1.0, 0.0]) == "John"
+
+def test_oldest_entries_are_evicted_at_the_cap():
+    cache = SemanticCache(max_entries=100)
+    vectors = np.eye(150, dtype=np.float32)
+    for i, vector in enumerate(vectors):
+        cache.add("u1", f"prompt {i}", vector, i)
+    # The buffer grew past its initial capacity, then overwrote the first 50 entries
+    for i in range(50):
+        assert cache.lookup("u1", vectors[i]) is None
+    for i in range(50, 150):
+        assert cache.lookup("u1", vectors[i]) == i
+
+def test_least_recently_used_users_are_evicted():
+    cache = SemanticCache(max_users=2)
+    for user_id in ("u1", "u2"):
+        cache.add(user_id, "First name", [1.0, 0.0], user_id)
+    assert cache.lookup("u1", [1.0, 0.0]) == "u1"  # u2 is now the least recently used
+    cache.add("u3", "First name", [1.0, 0.0], "u3")
+    assert cache.lookup("u2", [1.0, 0.0]) is None
+    assert cache.lookup("u1", [1.0, 0.0]) == "u1"
+    assert cache.lookup("u3", [1.0, 0.0]) == "u3"